@@ -0,0 +1,15 @@
+"""
+Celery app for background work (post image uploads)
+
+Only used when CELERY_BROKER_URL is set; start a worker with
+`celery -A campusfeed_project worker`.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'campusfeed_project.settings')
+
+app = Celery('campusfeed_project')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -55,6 +55,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.media',
+                'feed.context_processors.feed_now',
             ],
         },
     },
@@ -74,6 +75,52 @@ DATABASES = {
 }
 
 
+# Cache
+# Redis when REDIS_URL is set, per-process memory otherwise
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+
+# Whether every web process sees the same cache. Shortcuts that trust a value
+# written by another request (idle poll short-circuits, counters, lookup maps)
+# are only taken then; the per-process fallback would serve stale answers
+SHARED_CACHE = bool(os.environ.get('REDIS_URL'))
+
+
+# Realtime DMs
+# New messages are pushed over WebSockets through a Redis channel layer when
+# REDIS_URL is set; without it the conversation page falls back to polling
+
+ASGI_APPLICATION = 'campusfeed_project.asgi.application'
+
+CHANNEL_LAYERS = {}
+if os.environ.get('REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [os.environ['REDIS_URL']]},
+        }
+    }
+
+
+# Background tasks
+# Post images are stored by a Celery worker when a broker is configured,
+# inline in the request otherwise
+
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+CELERY_TASK_IGNORE_RESULT = True
+
+# Uploads awaiting the worker are staged in the default storage backend under
+# this prefix (random names, removed once stored), so a worker on another host
+# reads them the same way it writes the final media
+UPLOAD_SPOOL_LOCATION = 'upload_spool'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -1,9 +1,31 @@
 from django.contrib import admin
+from django.db.models.functions import Substr
 from .models import UserProfile, Post, Like, Comment, Bookmark, PostImage, DirectMessage, PostShare, Follow
 
+
+def is_changelist(request):
+    """Check if the admin request is for a changelist page"""
+    match = request.resolver_match
+    return bool(match and match.url_name and match.url_name.endswith('_changelist'))
+
+
+class DeferredChangelistMixin:
+    """
+    Skip loading large columns that a changelist never displays
+    """
+    changelist_defer = []
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.changelist_defer and is_changelist(request):
+            queryset = queryset.defer(*self.changelist_defer)
+        return queryset
+
+
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'department', 'level', 'created_at']
+    list_select_related = ['user']
     list_filter = ['department', 'level', 'created_at']
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['created_at']
@@ -12,11 +34,22 @@ class UserProfileAdmin(admin.ModelAdmin):
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = ['id', 'get_author_display', 'category', 'is_anonymous', 'likes_count', 'comments_count', 'created_at']
+    list_select_related = ['author']
     list_filter = ['category', 'is_anonymous', 'created_at']
     search_fields = ['content', 'author__username']
     readonly_fields = ['created_at', 'updated_at', 'likes_count', 'comments_count']
     date_hierarchy = 'created_at'
     
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if is_changelist(request):
+            # Only load the columns shown in list_display (content is used by __str__)
+            queryset = queryset.only(
+                'id', 'content', 'category', 'is_anonymous', 'likes_count', 'comments_count',
+                'created_at', 'author__username'
+            )
+        return queryset
+    
     def get_author_display(self, obj):
         return obj.get_author_display()
     get_author_display.short_description = 'Author'
@@ -31,8 +64,10 @@ class PostAdmin(admin.ModelAdmin):
 
 
 @admin.register(Like)
-class LikeAdmin(admin.ModelAdmin):
+class LikeAdmin(DeferredChangelistMixin, admin.ModelAdmin):
     list_display = ['user', 'post', 'created_at']
+    list_select_related = ['user', 'post__author']
+    changelist_defer = ['post__image', 'post__video']
     list_filter = ['created_at']
     search_fields = ['user__username', 'post__content']
     readonly_fields = ['created_at']
@@ -42,23 +77,37 @@ class LikeAdmin(admin.ModelAdmin):
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ['get_author_display', 'post', 'content_preview', 'is_anonymous', 'created_at']
+    list_select_related = ['author', 'post__author']
     list_filter = ['is_anonymous', 'created_at']
     search_fields = ['content', 'author__username', 'post__content']
     readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
     
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if is_changelist(request):
+            # Only load the columns shown in list_display, and just enough content for the preview
+            queryset = queryset.annotate(preview=Substr('content', 1, 51)).only(
+                'id', 'is_anonymous', 'created_at', 'author__username',
+                'post__is_anonymous', 'post__content', 'post__author__username'
+            )
+        return queryset
+    
     def get_author_display(self, obj):
         return obj.get_author_display()
     get_author_display.short_description = 'Author'
     
     def content_preview(self, obj):
-        return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
+        preview = obj.preview if hasattr(obj, 'preview') else obj.content
+        return preview[:50] + '...' if len(preview) > 50 else preview
     content_preview.short_description = 'Content'
 
 
 @admin.register(Bookmark)
-class BookmarkAdmin(admin.ModelAdmin):
+class BookmarkAdmin(DeferredChangelistMixin, admin.ModelAdmin):
     list_display = ['user', 'post', 'created_at']
+    list_select_related = ['user', 'post__author']
+    changelist_defer = ['post__image', 'post__video']
     list_filter = ['created_at']
     search_fields = ['user__username', 'post__content']
     readonly_fields = ['created_at']
@@ -66,22 +115,28 @@ class BookmarkAdmin(admin.ModelAdmin):
 
 
 @admin.register(PostImage)
-class PostImageAdmin(admin.ModelAdmin):
+class PostImageAdmin(DeferredChangelistMixin, admin.ModelAdmin):
     list_display = ['post', 'order', 'uploaded_at']
+    list_select_related = ['post__author']
+    changelist_defer = ['image', 'post__image', 'post__video']
     list_filter = ['uploaded_at']
     readonly_fields = ['uploaded_at']
 
 
 @admin.register(DirectMessage)
-class DirectMessageAdmin(admin.ModelAdmin):
+class DirectMessageAdmin(DeferredChangelistMixin, admin.ModelAdmin):
     list_display = ['sender', 'recipient', 'is_read', 'created_at']
+    list_select_related = ['sender', 'recipient']
+    changelist_defer = ['content', 'image', 'video', 'voice_note']
     list_filter = ['is_read', 'created_at']
     search_fields = ['sender__username', 'recipient__username', 'content']
     readonly_fields = ['created_at']
 
 
 @admin.register(PostShare)
-class PostShareAdmin(admin.ModelAdmin):
+class PostShareAdmin(DeferredChangelistMixin, admin.ModelAdmin):
     list_display = ['user', 'post', 'shared_via', 'created_at']
+    list_select_related = ['user', 'post__author']
+    changelist_defer = ['post__image', 'post__video']
     list_filter = ['shared_via', 'created_at']
     readonly_fields = ['created_at']
\ No newline at end of file
@@ -6,4 +6,5 @@ class FeedConfig(AppConfig):
     name = 'feed'
 
     def ready(self):
-        import feed.signals  # Import signals when app is ready
\ No newline at end of file
+        from .signals import connect_receivers
+        connect_receivers()
@@ -0,0 +1,131 @@
+"""
+Cache keys and helpers shared by the feed views and signal receivers
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+
+# Newest post time per category, so idle polls can skip the database
+LATEST_POST_TTL = 300
+
+# check_new_posts results, shared by polls within the same 5 second window
+NEW_POSTS_COUNT_TTL = 5
+NEW_POSTS_SINCE_BUCKET = 5
+
+# Newest message time per conversation, so idle DM polls can skip the database
+LAST_MESSAGE_TTL = 300
+
+# Conversation id per user pair, so DM endpoints skip the pair lookup
+DM_CONVERSATION_TTL = 3600
+
+
+# User id per username, so DM endpoints that only need the id skip auth_user;
+# dropped by the User receivers on rename or delete
+USER_ID_TTL = 600
+
+# Outcome of a DM whose media the worker is storing, checked by the sender's page
+MEDIA_SEND_TTL = 600
+
+# DM unread badge count per user, adjusted on send/read and rebuilt from the
+# database on a miss. Short, since a send racing a rebuild can be lost
+UNREAD_COUNT_TTL = 60
+
+
+
+def latest_post_key(category):
+    return f'feed:latest_post_at:{category}'
+
+
+def new_posts_count_key(user_id, category, since_dt, latest_post_at=None):
+    """
+    Include the category's latest post time so a new post changes the key
+    instead of waiting out the TTL
+    """
+    since_bucket = int(since_dt.timestamp()) // NEW_POSTS_SINCE_BUCKET
+    latest = latest_post_at.timestamp() if latest_post_at else 0
+    return f'feed:new_posts:{user_id}:{category}:{since_bucket}:{latest}'
+
+
+def remember_latest_post(post):
+    """Record a newly created post's timestamp for its category and for 'all'"""
+    cache.set_many({
+        latest_post_key('all'): post.created_at,
+        latest_post_key(post.category): post.created_at,
+    }, LATEST_POST_TTL)
+
+
+def dm_conversation_key(user_id, other_user_id):
+    """Same key whichever side of the conversation asks"""
+    low, high = sorted((user_id, other_user_id))
+    return f'feed:dm_conversation:{low}:{high}'
+
+
+def unread_count_key(user_id):
+    return f'feed:unread_dm:{user_id}'
+
+
+def adjust_unread_count(user_id, delta):
+    """
+    Apply a change to a cached unread count once the current transaction
+    commits (see settings.SHARED_CACHE)
+    """
+    if not delta or not settings.SHARED_CACHE:
+        return
+    transaction.on_commit(lambda: apply_unread_delta(unread_count_key(user_id), delta))
+
+
+def apply_unread_delta(key, delta):
+    """
+    A missing key is left for get_unread_count to rebuild; one that drifts
+    below zero is dropped so the next read recounts it
+    """
+    try:
+        count = cache.incr(key, delta)
+    except ValueError:
+        return
+    if count < 0:
+        cache.delete(key)
+
+
+def last_message_key(conversation_id):
+    return f'feed:last_message_at:{conversation_id}'
+
+
+def remember_last_message(message):
+    """Record a newly sent message's timestamp for its conversation"""
+    cache.set(last_message_key(message.conversation_id), message.created_at, LAST_MESSAGE_TTL)
+
+
+def user_id_key(username):
+    return f'feed:user_id:{username}'
+
+
+def resolve_user_id(username):
+    """
+    Id of the user with this username (None if there is none), cached per
+    settings.SHARED_CACHE
+    """
+    if not settings.SHARED_CACHE:
+        return User.objects.filter(username=username).values_list('id', flat=True).first()
+    
+    key = user_id_key(username)
+    user_id = cache.get(key)
+    if user_id is None:
+        user_id = User.objects.filter(username=username).values_list('id', flat=True).first()
+        if user_id is not None:
+            cache.set(key, user_id, USER_ID_TTL)
+    return user_id
+
+
+def forget_user_id(username):
+    cache.delete(user_id_key(username))
+
+
+def media_send_key(token):
+    return f'feed:media_send:{token}'
+
+
+def record_media_send(token, sender_id, status):
+    """Record where a worker-handled DM stands: 'pending', 'sent' or 'failed'"""
+    cache.set(media_send_key(token), {'sender_id': sender_id, 'status': status}, MEDIA_SEND_TTL)
@@ -0,0 +1,47 @@
+"""
+WebSocket consumers
+"""
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .caching import adjust_unread_count
+from .models import Conversation, DirectMessage
+from .realtime import conversation_group
+
+
+class ConversationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Streams new messages in one conversation to a participant, replacing the
+    get_new_messages poll
+    """
+    async def connect(self):
+        self.user = self.scope['user']
+        self.conversation_id = self.scope['url_route']['kwargs']['cid']
+        self.group_name = conversation_group(self.conversation_id)
+        
+        if not self.user.is_authenticated or not await self.is_participant():
+            await self.close()
+            return
+        
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+    
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+    
+    async def chat_message(self, event):
+        # The sender's page already rendered its own message from the send response
+        if event['sender_id'] == self.user.id:
+            return
+        
+        await self.mark_read(event['message']['id'])
+        await self.send_json({**event['message'], 'is_own': False})
+    
+    @database_sync_to_async
+    def is_participant(self):
+        return Conversation.objects.filter(id=self.conversation_id, participants=self.user).exists()
+    
+    @database_sync_to_async
+    def mark_read(self, message_id):
+        marked = DirectMessage.objects.filter(id=message_id, recipient=self.user, is_read=False).update(is_read=True)
+        adjust_unread_count(self.user.id, -marked)
@@ -0,0 +1,9 @@
+from django.utils import timezone
+
+
+def feed_now(request):
+    """
+    Expose a single timestamp per render so smart_time doesn't call
+    timezone.now() once per post
+    """
+    return {'feed_now': timezone.now()}
@@ -0,0 +1,12 @@
+class PostIdConverter:
+    """
+    Path converter for post ids. Capping the width rejects oversized
+    values at routing time instead of at the database.
+    """
+    regex = '[0-9]{1,10}'
+    
+    def to_python(self, value):
+        return int(value)
+    
+    def to_url(self, value):
+        return str(value)
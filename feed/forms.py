@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from .models import UserProfile, Post
+from .models import UserProfile, Post, PostImage
 
 
 class MultipleFileInput(forms.ClearableFileInput):
@@ -17,11 +17,12 @@ class MultipleFileField(forms.FileField):
 
     def clean(self, data, initial=None):
         single_file_clean = super().clean
-        if isinstance(data, (list, tuple)):
-            result = [single_file_clean(d, initial) for d in data]
-        else:
-            result = single_file_clean(data, initial)
-        return result
+        if not isinstance(data, (list, tuple)):
+            return single_file_clean(data, initial)
+        if not data:
+            # Nothing uploaded: let FileField enforce `required`, otherwise skip the loop
+            return single_file_clean(None, initial) if self.required else []
+        return [single_file_clean(d, initial) for d in data]
 
 
 class UserRegistrationForm(UserCreationForm):
@@ -36,6 +37,29 @@ class UserRegistrationForm(UserCreationForm):
         })
     )
     
+    # Declared here (rather than patched in __init__) so the styling is set up once
+    password1 = forms.CharField(
+        label='Password',
+        strip=False,
+        widget=forms.PasswordInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Password',
+            'autocomplete': 'new-password'
+        }),
+        help_text='Your password must contain at least 8 characters.'
+    )
+    
+    password2 = forms.CharField(
+        label='Password confirmation',
+        strip=False,
+        widget=forms.PasswordInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Confirm password',
+            'autocomplete': 'new-password'
+        }),
+        help_text='Enter the same password as before, for verification.'
+    )
+    
     class Meta:
         model = User
         fields = ['username', 'email', 'password1', 'password2']
@@ -45,29 +69,17 @@ class UserRegistrationForm(UserCreationForm):
                 'placeholder': 'Username'
             }),
         }
-    
-    def __init__(self, *args, **kwargs):
-        super(UserRegistrationForm, self).__init__(*args, **kwargs)
-        self.fields['password1'].widget.attrs.update({
-            'class': 'form-control',
-            'placeholder': 'Password'
-        })
-        self.fields['password2'].widget.attrs.update({
-            'class': 'form-control',
-            'placeholder': 'Confirm password'
-        })
-        
-        self.fields['username'].help_text = 'Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.'
-        self.fields['password1'].help_text = 'Your password must contain at least 8 characters.'
+        help_texts = {
+            'username': 'Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.',
+        }
     
     def save(self, commit=True):
         user = super(UserRegistrationForm, self).save(commit=False)
         user.email = self.cleaned_data['email']
         
         if commit:
+            # The post_save receiver creates the profile
             user.save()
-            profile = user.profile
-            profile.save()
         
         return user
 
@@ -131,8 +143,9 @@ class ProfileUpdateForm(forms.ModelForm):
         if commit:
             profile.save()
             user = profile.user
-            user.email = self.cleaned_data['email']
-            user.save()
+            if user.email != self.cleaned_data['email']:
+                user.email = self.cleaned_data['email']
+                user.save(update_fields=['email'])
         
         return profile
 
@@ -147,42 +160,43 @@ class PostForm(forms.ModelForm):
         label='Add images (optional)'
     )
     
+    # All fields are optional - the view checks that at least content or media exists
+    content = forms.CharField(
+        required=False,
+        label='What\'s on your mind?',
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 3,
+            'placeholder': "What's on your mind?",
+        })
+    )
+    
+    category = forms.ChoiceField(
+        choices=Post.CATEGORY_CHOICES,
+        required=False,
+        label='Category (optional)',
+        widget=forms.Select(attrs={
+            'class': 'form-control'
+        })
+    )
+    
     class Meta:
         model = Post
         fields = ['content', 'video', 'category', 'is_anonymous']
         widgets = {
-            'content': forms.Textarea(attrs={
-                'class': 'form-control',
-                'rows': 3,
-                'placeholder': "What's on your mind?",
-            }),
             'video': forms.FileInput(attrs={
                 'class': 'form-control',
                 'accept': 'video/*'
             }),
-            'category': forms.Select(attrs={
-                'class': 'form-control'
-            }),
             'is_anonymous': forms.CheckboxInput(attrs={
                 'class': 'form-check-input'
             }),
         }
         labels = {
-            'content': 'What\'s on your mind?',
             'video': 'Add a video (optional)',
-            'category': 'Category (optional)',
             'is_anonymous': 'Post anonymously'
         }
     
-    def __init__(self, *args, **kwargs):
-        super(PostForm, self).__init__(*args, **kwargs)
-        # Make all fields optional - validation will check if at least one media exists
-        self.fields['content'].required = False
-        self.fields['video'].required = False
-        self.fields['category'].required = False
-        self.fields['images'].required = False
-        self.fields['category'].empty_label = "Select category (optional)"
-    
     def clean(self):
         cleaned_data = super().clean()
         content = cleaned_data.get('content', '').strip()
@@ -194,4 +208,22 @@ class PostForm(forms.ModelForm):
         # Don't raise validation error here - let the view handle it
         # since we need to check request.FILES for multiple images
         
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+    
+    def save(self, commit=True):
+        post = super(PostForm, self).save(commit=commit)
+        
+        if commit:
+            self.save_images(post)
+        
+        return post
+    
+    def save_images(self, post):
+        """
+        Store the uploaded images for a saved post with a single INSERT
+        """
+        images = self.cleaned_data.get('images') or []
+        return PostImage.objects.bulk_create([
+            PostImage(post=post, image=image, order=idx)
+            for idx, image in enumerate(images)
+        ])
\ No newline at end of file
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from feed.models import Post, Like, Comment, PostShare
+
+
+def count_for_post(model):
+    """Correlated subquery counting `model` rows for the outer post"""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(
+                total=Count('pk')
+            ).values('total')
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = 'Recount the denormalized like/comment/share counters on every post'
+
+    def handle(self, *args, **options):
+        # Triggers (migration 0011) keep likes/comments in sync and the share views bump
+        # shares_count with F(); this fixes any drift
+        updated = Post.objects.update(
+            likes_count=count_for_post(Like),
+            comments_count=count_for_post(Comment),
+            shares_count=count_for_post(PostShare),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counters on {updated} post(s).'))
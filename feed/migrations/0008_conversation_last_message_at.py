@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-15 20:55
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_last_message_at(apps, schema_editor):
+    Conversation = apps.get_model('feed', 'Conversation')
+    conversations = Conversation.objects.annotate(latest=Max('messages__created_at'))
+    for conversation in conversations:
+        conversation.last_message_at = conversation.latest or conversation.created_at
+    Conversation.objects.bulk_update(conversations, ['last_message_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0007_feed_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='conversation',
+            options={'ordering': ['-last_message_at']},
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_last_message_at, migrations.RunPython.noop),
+    ]
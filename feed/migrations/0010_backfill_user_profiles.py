@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-15 21:00
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserProfile = apps.get_model('feed', 'UserProfile')
+    UserProfile.objects.bulk_create([
+        UserProfile(user=user)
+        for user in User.objects.filter(profile__isnull=True).only('id')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0009_follow_unique_constraint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.6 on 2026-10-15 21:30
+
+from django.db import migrations
+
+
+# (trigger name, source model, event, Post counter column, delta)
+COUNTER_TRIGGERS = [
+    ('feed_like_ai', 'Like', 'INSERT', 'likes_count', '+ 1'),
+    ('feed_like_ad', 'Like', 'DELETE', 'likes_count', '- 1'),
+    ('feed_comment_ai', 'Comment', 'INSERT', 'comments_count', '+ 1'),
+    ('feed_comment_ad', 'Comment', 'DELETE', 'comments_count', '- 1'),
+]
+
+
+def counter_triggers(apps):
+    post_table = apps.get_model('feed', 'Post')._meta.db_table
+    for name, model_name, event, column, delta in COUNTER_TRIGGERS:
+        table = apps.get_model('feed', model_name)._meta.db_table
+        row = 'NEW' if event == 'INSERT' else 'OLD'
+        update = f'UPDATE {post_table} SET {column} = {column} {delta} WHERE id = {row}.post_id'
+        yield name, table, event, update
+
+
+def create_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for name, table, event, update in counter_triggers(apps):
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'CREATE FUNCTION {name}_fn() RETURNS trigger AS $$ '
+                f'BEGIN {update}; RETURN NULL; END; $$ LANGUAGE plpgsql'
+            )
+            schema_editor.execute(
+                f'CREATE TRIGGER {name} AFTER {event} ON {table} '
+                f'FOR EACH ROW EXECUTE FUNCTION {name}_fn()'
+            )
+        elif vendor == 'sqlite':
+            schema_editor.execute(
+                f'CREATE TRIGGER {name} AFTER {event} ON {table} '
+                f'FOR EACH ROW BEGIN {update}; END'
+            )
+        elif vendor == 'mysql':
+            schema_editor.execute(
+                f'CREATE TRIGGER {name} AFTER {event} ON {table} FOR EACH ROW {update}'
+            )
+        else:
+            raise NotImplementedError(f'Post counter triggers are not implemented for {vendor}')
+
+
+def drop_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for name, table, event, update in counter_triggers(apps):
+        if vendor == 'postgresql':
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name} ON {table}')
+            schema_editor.execute(f'DROP FUNCTION IF EXISTS {name}_fn()')
+        else:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0010_backfill_user_profiles'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:10
+
+from django.db import migrations
+
+
+# Matches the expression PostQuerySet.search() builds with SearchVector('content', config='english')
+CREATE_INDEX = (
+    "CREATE INDEX post_content_search_idx ON feed_post "
+    "USING gin (to_tsvector('english'::regconfig, COALESCE(content, '')))"
+)
+DROP_INDEX = "DROP INDEX IF EXISTS post_content_search_idx"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0011_post_counter_triggers'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-15 23:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0013_post_keyset_ordering'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='directmessage',
+            index=models.Index(fields=['conversation', '-id'], name='dm_conv_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-15 23:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0014_directmessage_thread_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='directmessage',
+            name='dm_recipient_read_idx',
+        ),
+        migrations.AddIndex(
+            model_name='directmessage',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient'], name='dm_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='directmessage',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['conversation', 'recipient'], name='dm_conv_unread_idx'),
+        ),
+    ]
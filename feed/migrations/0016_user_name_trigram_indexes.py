@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-15 23:55
+
+from django.conf import settings
+from django.db import migrations
+
+
+# Trigram indexes over the exact expression Django emits for __icontains on
+# PostgreSQL (UPPER(col::text) LIKE UPPER('%q%')), so the user searches in
+# search_users_dm and search stop scanning auth_user
+TRIGRAM_COLUMNS = {
+    'user_username_trgm_idx': 'username',
+    'user_first_name_trgm_idx': 'first_name',
+    'user_last_name_trgm_idx': 'last_name',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_COLUMNS.items():
+        schema_editor.execute(
+            f"CREATE INDEX {name} ON auth_user USING gin (UPPER({column}::text) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0015_directmessage_unread_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
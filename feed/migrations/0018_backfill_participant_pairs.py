@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-15 23:59
+
+from django.db import migrations
+
+
+def backfill_participant_pairs(apps, schema_editor):
+    Conversation = apps.get_model('feed', 'Conversation')
+    Participant = Conversation.participants.through
+    participant_ids = {}
+    for conversation_id, user_id in Participant.objects.values_list('conversation_id', 'user_id'):
+        participant_ids.setdefault(conversation_id, []).append(user_id)
+    
+    # Oldest conversation wins when a pair raced into duplicate threads; the
+    # others keep a null pair and stay reachable from the inbox
+    seen = set()
+    conversations = []
+    for conversation in Conversation.objects.filter(id__in=participant_ids).order_by('id'):
+        pair = tuple(sorted(participant_ids[conversation.id]))
+        if len(pair) != 2 or pair in seen:
+            continue
+        seen.add(pair)
+        conversation.user_low_id, conversation.user_high_id = pair
+        conversations.append(conversation)
+    Conversation.objects.bulk_update(conversations, ['user_low', 'user_high'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feed', '0017_conversation_participant_pair'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_participant_pairs, migrations.RunPython.noop),
+    ]
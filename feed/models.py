@@ -1,8 +1,17 @@
-from django.db import models
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, models
+from django.db.models import Count, Exists, OuterRef, Q, Subquery, Value
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.functional import cached_property
 import re
 
+HASHTAG_RE = re.compile(r'#(\w+)')
+
+# Text search configuration for post content; must match post_content_search_idx
+SEARCH_CONFIG = 'english'
+
+
 class UserProfile(models.Model):
     """
     Extended user profile with campus-specific information
@@ -28,6 +37,10 @@ class UserProfile(models.Model):
         ('GRAD', 'Graduate'),
     ]
     
+    # Display lookups built once instead of scanning the choices on every call
+    DEPARTMENT_DISPLAY = dict(DEPARTMENT_CHOICES)
+    LEVEL_DISPLAY = dict(LEVEL_CHOICES)
+    
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
     department = models.CharField(max_length=50, choices=DEPARTMENT_CHOICES, blank=True)
@@ -38,17 +51,71 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Profile"
     
-    def get_profile_picture_url(self):
-        """Return profile picture URL or default avatar"""
+    @cached_property
+    def picture_url(self):
+        """Profile picture URL (or None), resolved through storage once per instance"""
         if self.profile_picture:
             return self.profile_picture.url
         return None
     
+    def get_profile_picture_url(self):
+        """Return profile picture URL or default avatar"""
+        return self.picture_url
+    
     class Meta:
         verbose_name = 'User Profile'
         verbose_name_plural = 'User Profiles'
 
 
+class PostQuerySet(models.QuerySet):
+    """
+    Reusable query helpers for rendering posts
+    """
+    def with_author(self):
+        """Join the author and their profile so get_author_info() doesn't query per post"""
+        return self.select_related('author', 'author__profile')
+    
+    def for_listing(self):
+        """with_author() trimmed to the columns the post list templates render"""
+        return self.with_author().only(
+            'id', 'author', 'is_anonymous', 'content', 'image', 'video', 'category', 'created_at',
+            'likes_count', 'comments_count', 'shares_count',
+            'author__username',
+            'author__profile__department', 'author__profile__level', 'author__profile__profile_picture'
+        )
+    
+    def with_liked(self, user):
+        """Annotate is_liked for the user"""
+        return self.annotate(
+            is_liked=Exists(Like.objects.filter(user=user, post=OuterRef('pk')))
+        )
+    
+    def with_user_state(self, user):
+        """Annotate is_liked / is_bookmarked for the user instead of loading all their ids"""
+        return self.with_liked(user).annotate(
+            is_bookmarked=Exists(Bookmark.objects.filter(user=user, post=OuterRef('pk')))
+        )
+    
+    def search(self, query):
+        """
+        Posts whose content matches query, annotated with search_rank.
+        On PostgreSQL this is full-text search backed by post_content_search_idx;
+        other databases fall back to a substring match with a constant rank.
+        """
+        if connections[self.db].vendor != 'postgresql':
+            return self.filter(content__icontains=query).annotate(search_rank=Value(0.0))
+        
+        vector = SearchVector('content', config=SEARCH_CONFIG)
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        return self.annotate(search_vector=vector).filter(
+            search_vector=search_query
+        ).annotate(search_rank=SearchRank(vector, search_query))
+    
+    def bookmarked_by(self, user):
+        """Posts the user has bookmarked, most recently bookmarked first"""
+        return self.filter(bookmarks__user=user).order_by('-bookmarks__created_at')
+
+
 class Post(models.Model):
     """
     Main post model for CampusFeed
@@ -65,6 +132,8 @@ class Post(models.Model):
         ('QUESTION', 'Question'),
     ]
     
+    CATEGORY_DISPLAY = dict(CATEGORY_CHOICES)
+    
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts', null=True, blank=True)
     is_anonymous = models.BooleanField(default=False)
     content = models.TextField()
@@ -77,22 +146,29 @@ class Post(models.Model):
     comments_count = models.IntegerField(default=0)
     shares_count = models.IntegerField(default=0)
     
+    objects = PostQuerySet.as_manager()
+    
     def __str__(self):
         author_name = "Anonymous" if self.is_anonymous else self.author.username
         return f"{author_name} - {self.content[:50]}"
     
     class Meta:
-        ordering = ['-created_at']  # Latest posts first
+        ordering = ['-created_at', '-id']  # Latest posts first; id breaks ties for keyset paging
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='post_created_id_idx'),
+            models.Index(fields=['category', '-created_at'], name='post_category_created_idx'),
+            models.Index(fields=['author', '-created_at'], name='post_author_created_idx'),
+        ]
     
     def update_likes_count(self):
-        """Update the cached likes count"""
+        """Recount the cached likes count (database triggers keep it in sync incrementally)"""
         self.likes_count = self.likes.count()
         self.save(update_fields=['likes_count'])
     
     def update_comments_count(self):
-        """Update the cached comments count"""
+        """Recount the cached comments count (database triggers keep it in sync incrementally)"""
         self.comments_count = self.comments.count()
         self.save(update_fields=['comments_count'])
     
@@ -104,18 +180,14 @@ class Post(models.Model):
     
     def extract_hashtags(self):
         """Extract hashtags from content"""
-        return re.findall(r'#(\w+)', self.content)
+        return HASHTAG_RE.findall(self.content)
     
     def get_content_with_hashtag_links(self):
         """Return content with clickable hashtag links"""
-        content = self.content
-        hashtags = self.extract_hashtags()
-        for tag in hashtags:
-            content = content.replace(
-                f'#{tag}',
-                f'<a href="/feed/?q=%23{tag}" class="text-primary text-decoration-none">#{tag}</a>'
-            )
-        return content
+        return HASHTAG_RE.sub(
+            r'<a href="/feed/?q=%23\1" class="text-primary text-decoration-none">#\1</a>',
+            self.content
+        )
     
     def get_author_info(self):
         """Return author info for display"""
@@ -126,34 +198,34 @@ class Post(models.Model):
                 'level': '',
                 'profile_picture': None
             }
-        try:
-            profile = self.author.profile
-            return {
-                'username': self.author.username,
-                'department': profile.get_department_display() if profile.department else '',
-                'level': profile.get_level_display() if profile.level else '',
-                'profile_picture': profile.get_profile_picture_url()
-            }
-        except UserProfile.DoesNotExist:
+        if not hasattr(self.author, 'profile'):
             return {
                 'username': self.author.username,
                 'department': '',
                 'level': '',
                 'profile_picture': None
             }
+        profile = self.author.profile
+        return {
+            'username': self.author.username,
+            'department': UserProfile.DEPARTMENT_DISPLAY.get(profile.department, profile.department),
+            'level': UserProfile.LEVEL_DISPLAY.get(profile.level, profile.level),
+            'profile_picture': profile.get_profile_picture_url()
+        }
 
-    # Add these methods to your Post model class
+    # The image helpers below iterate self.images.all() so they are served from
+    # the cache when the queryset uses prefetch_related('images') (as feed views do)
 
     def has_media(self):
         """Check if post has any media attached"""
-        return self.images.exists() or bool(self.video) or bool(self.image)
+        return bool(self.images.all()) or bool(self.video) or bool(self.image)
 
     def get_image_count(self):
         """Get count of images (including old single image field)"""
-        count = self.images.count()
-        if self.image and not self.images.exists():
-            count += 1
-        return count
+        images_list = list(self.images.all())
+        if images_list:
+            return len(images_list)
+        return 1 if self.image else 0
 
     def get_all_images(self):
         """Get all images including the old single image field if it exists"""
@@ -166,11 +238,10 @@ class Post(models.Model):
 
     def get_first_image(self):
         """Get first image for thumbnail/preview"""
-        if self.images.exists():
-            return self.images.first().image
-        elif self.image:
-            return self.image
-        return None
+        images_list = list(self.images.all())
+        if images_list:
+            return images_list[0].image
+        return self.image or None
 
 
 class Like(models.Model):
@@ -188,7 +259,7 @@ class Like(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.user.username} likes post {self.post.id}"
+        return f"{self.user.username} likes post {self.post_id}"
 
 
 class Comment(models.Model):
@@ -207,10 +278,13 @@ class Comment(models.Model):
         ordering = ['created_at']  # Oldest comments first
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
+        indexes = [
+            models.Index(fields=['post', 'created_at'], name='comment_post_created_idx'),
+        ]
     
     def __str__(self):
         author_name = "Anonymous" if self.is_anonymous else (self.author.username if self.author else "Unknown")
-        return f"{author_name} commented on post {self.post.id}"
+        return f"{author_name} commented on post {self.post_id}"
     
     def get_author_display(self):
         """Return author name or Anonymous"""
@@ -234,7 +308,7 @@ class Bookmark(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.user.username} bookmarked post {self.post.id}"
+        return f"{self.user.username} bookmarked post {self.post_id}"
 
 
 class PostImage(models.Model):
@@ -252,7 +326,52 @@ class PostImage(models.Model):
         verbose_name_plural = 'Post Images'
     
     def __str__(self):
-        return f"Image for post {self.post.id}"
+        return f"Image for post {self.post_id}"
+
+
+class ConversationQuerySet(models.QuerySet):
+    """
+    Reusable query helpers for the DM inbox
+    """
+    def for_user(self, user):
+        """Conversations the user takes part in"""
+        return self.filter(participants=user)
+    
+    def between(self, user_id, other_user_id):
+        """The conversation between two users, looked up by its ordered participant pair"""
+        user_low_id, user_high_id = sorted((user_id, other_user_id))
+        return self.filter(user_low_id=user_low_id, user_high_id=user_high_id)
+    
+    def with_other_participants(self, user):
+        """
+        Prefetch the participants other than user into others, with just the
+        columns a conversation list shows
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                'participants',
+                queryset=User.objects.exclude(id=user.id).select_related('profile').only(
+                    'id', 'username', 'first_name', 'last_name', 'profile__profile_picture'
+                ),
+                to_attr='others',
+            )
+        )
+    
+    def with_last_message_id(self):
+        """
+        Annotate last_message_id with a correlated LIMIT 1 subquery, which walks
+        dm_conv_created_idx instead of ranking every message in the conversations
+        """
+        newest = DirectMessage.objects.filter(
+            conversation=OuterRef('pk')
+        ).order_by('-created_at').values('id')[:1]
+        return self.annotate(last_message_id=Subquery(newest))
+    
+    def with_unread(self, user):
+        """Annotate unread_count for the user in the same query"""
+        return self.annotate(
+            unread_count=Count('messages', filter=Q(messages__is_read=False) & ~Q(messages__sender=user))
+        )
 
 
 class Conversation(models.Model):
@@ -260,27 +379,43 @@ class Conversation(models.Model):
     Conversation thread between two users
     """
     participants = models.ManyToManyField(User, related_name='conversations')
+    # The participants' ids in ascending order; unique, so a pair only ever gets one thread
+    user_low = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    user_high = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    last_message_at = models.DateTimeField(default=timezone.now, db_index=True)  # Set by DirectMessage.save
+    
+    objects = ConversationQuerySet.as_manager()
     
     class Meta:
-        ordering = ['-updated_at']
+        ordering = ['-last_message_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user_low', 'user_high'], name='conversation_pair_uniq'),
+        ]
     
     def get_other_participant(self, user):
-        """Get the other user in the conversation"""
-        return self.participants.exclude(id=user.id).first()
+        """Get the other user in the conversation (lists should use ConversationQuerySet.with_other_participants)"""
+        for participant in self.participants.all():
+            if participant.id != user.id:
+                return participant
+        return None
     
     def get_last_message(self):
-        """Get the most recent message"""
-        return self.messages.first()
+        """Get the most recent message (lists should use ConversationQuerySet.with_last_message_id)"""
+        return self.messages.order_by('-created_at').first()
     
     def get_unread_count(self, user):
-        """Get unread message count for a user"""
+        """Get unread message count for a user (prefer ConversationQuerySet.with_unread in lists)"""
         return self.messages.filter(is_read=False).exclude(sender=user).count()
     
     def __str__(self):
-        users = self.participants.all()
-        return f"Conversation: {', '.join([u.username for u in users])}"
+        # Usernames only when participants were prefetched; otherwise the pair's
+        # ids, so printing a conversation never queries
+        users = getattr(self, '_prefetched_objects_cache', {}).get('participants')
+        if users is not None:
+            return f"Conversation: {', '.join([u.username for u in users])}"
+        return f"Conversation: {self.user_low_id}, {self.user_high_id}"
 
 
 class DirectMessage(models.Model):
@@ -318,25 +453,40 @@ class DirectMessage(models.Model):
         ordering = ['created_at']  # Oldest first for chat display
         verbose_name = 'Direct Message'
         verbose_name_plural = 'Direct Messages'
+        indexes = [
+            models.Index(fields=['conversation', '-created_at'], name='dm_conv_created_idx'),
+            models.Index(fields=['conversation', '-id'], name='dm_conv_id_idx'),
+            # Partial indexes only hold unread rows, so they stay small as history grows
+            models.Index(fields=['recipient'], name='dm_unread_idx', condition=Q(is_read=False)),
+            models.Index(fields=['conversation', 'recipient'], name='dm_conv_unread_idx', condition=Q(is_read=False)),
+        ]
+    
+    # Attachment fields checked in priority order when detecting the message type
+    MEDIA_MESSAGE_TYPES = (
+        ('voice_note', 'VOICE'),
+        ('video', 'VIDEO'),
+        ('image', 'IMAGE'),
+    )
     
     def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        
         # Auto-detect message type
-        if self.voice_note:
-            self.message_type = 'VOICE'
-        elif self.video:
-            self.message_type = 'VIDEO'
-        elif self.image:
-            self.message_type = 'IMAGE'
-        elif self.post:
-            self.message_type = 'POST'
+        for field_name, message_type in self.MEDIA_MESSAGE_TYPES:
+            if getattr(self, field_name):
+                self.message_type = message_type
+                break
         else:
-            self.message_type = 'TEXT'
+            self.message_type = 'POST' if self.post_id else 'TEXT'
         
         super().save(*args, **kwargs)
         
-        # Update conversation timestamp
-        if self.conversation:
-            self.conversation.save()  # Triggers updated_at
+        # Bump the conversation timestamps without reloading or resaving the whole row
+        if self.conversation_id:
+            timestamps = {'updated_at': timezone.now()}
+            if is_new:
+                timestamps['last_message_at'] = self.created_at
+            Conversation.objects.filter(pk=self.conversation_id).update(**timestamps)
     
     def __str__(self):
         return f"{self.sender.username} to {self.recipient.username}: {self.message_type}"
@@ -360,7 +510,7 @@ class PostShare(models.Model):
         verbose_name_plural = 'Post Shares'
     
     def __str__(self):
-        return f"{self.user.username} shared post {self.post.id}"
+        return f"{self.user.username} shared post {self.post_id}"
 
 
 class Follow(models.Model):
@@ -372,10 +522,17 @@ class Follow(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        unique_together = ('follower', 'following')
         ordering = ['-created_at']
         verbose_name = 'Follow'
         verbose_name_plural = 'Follows'
+        constraints = [
+            models.UniqueConstraint(fields=['follower', 'following'], name='uniq_follow'),
+        ]
+        indexes = [
+            models.Index(fields=['following', '-created_at'], name='follow_following_created_idx'),
+            # Reverse of uniq_follow's index, for "who follows X" lookups
+            models.Index(fields=['following', 'follower'], name='follow_following_follower_idx'),
+        ]
     
     def __str__(self):
         return f"{self.follower.username} follows {self.following.username}"
\ No newline at end of file
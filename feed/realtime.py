@@ -0,0 +1,19 @@
+"""
+Push helpers for the DM WebSocket consumer
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+
+def conversation_group(conversation_id):
+    return f'conv_{conversation_id}'
+
+
+def publish_message(conversation_id, sender_id, payload):
+    """
+    Fan a serialized message out to every socket open on the conversation
+    """
+    async_to_sync(get_channel_layer().group_send)(
+        conversation_group(conversation_id),
+        {'type': 'chat.message', 'sender_id': sender_id, 'message': payload},
+    )
@@ -0,0 +1,9 @@
+"""
+WebSocket URL configuration for feed app
+"""
+from django.urls import path
+from . import consumers
+
+websocket_urlpatterns = [
+    path('ws/conv/<int:cid>/', consumers.ConversationConsumer.as_asgi()),
+]
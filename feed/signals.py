@@ -1,56 +1,80 @@
-from django.db.models.signals import post_save, post_delete
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.contrib.auth.models import User
-from django.dispatch import receiver
-from .models import UserProfile, Like, Comment
+from .caching import adjust_unread_count, forget_user_id, remember_last_message, remember_latest_post
+from .models import DirectMessage, Post, UserProfile
 
-@receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """
-    Automatically create a UserProfile when a new User is created
+    Automatically create a UserProfile when a new User is created.
+    Saving an existing User leaves its (unchanged) profile alone.
     """
     if created:
         UserProfile.objects.create(user=instance)
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+
+def forget_renamed_user(sender, instance, update_fields=None, **kwargs):
     """
-    Save the UserProfile when User is saved
+    Drop the cached id of a user's old username when it changes; saves limited
+    to other fields (like login's last_login update) skip the lookup, and so
+    does every save when resolve_user_id isn't caching
     """
-    try:
-        instance.profile.save()
-    except UserProfile.DoesNotExist:
-        UserProfile.objects.create(user=instance)
+    if not settings.SHARED_CACHE or instance.pk is None:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    old_username = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+    if old_username and old_username != instance.username:
+        forget_user_id(old_username)
+
+
+def forget_deleted_user(sender, instance, **kwargs):
+    """
+    Drop a deleted user's cached id
+    """
+    forget_user_id(instance.username)
 
 
-@receiver(post_save, sender=Like)
-def update_post_likes_on_create(sender, instance, created, **kwargs):
+def record_latest_post(sender, instance, created, **kwargs):
     """
-    Update post likes count when a like is created
+    Keep the per-category latest post time fresh for check_new_posts
     """
     if created:
-        instance.post.update_likes_count()
+        remember_latest_post(instance)
 
 
-@receiver(post_delete, sender=Like)
-def update_post_likes_on_delete(sender, instance, **kwargs):
+def count_unread_message(sender, instance, created, **kwargs):
     """
-    Update post likes count when a like is deleted
+    Bump the recipient's cached unread count for each new message
     """
-    instance.post.update_likes_count()
+    if created and not instance.is_read:
+        adjust_unread_count(instance.recipient_id, 1)
 
 
-@receiver(post_save, sender=Comment)
-def update_post_comments_on_create(sender, instance, created, **kwargs):
+def record_last_message(sender, instance, created, **kwargs):
     """
-    Update post comments count when a comment is created
+    Keep the per-conversation last message time fresh for get_new_messages
     """
-    if created:
-        instance.post.update_comments_count()
+    if created and instance.conversation_id:
+        remember_last_message(instance)
+
+
+def uncount_unread_message(sender, instance, **kwargs):
+    """
+    Drop a deleted message from the recipient's cached unread count
+    """
+    if not instance.is_read:
+        adjust_unread_count(instance.recipient_id, -1)
 
 
-@receiver(post_delete, sender=Comment)
-def update_post_comments_on_delete(sender, instance, **kwargs):
+def connect_receivers():
     """
-    Update post comments count when a comment is deleted
+    Connect the feed app's signal receivers; called once from FeedConfig.ready()
     """
-    instance.post.update_comments_count()
\ No newline at end of file
+    post_save.connect(create_user_profile, sender=User, dispatch_uid="feed.create_user_profile", weak=False)
+    pre_save.connect(forget_renamed_user, sender=User, dispatch_uid="feed.forget_renamed_user", weak=False)
+    post_delete.connect(forget_deleted_user, sender=User, dispatch_uid="feed.forget_deleted_user", weak=False)
+    post_save.connect(record_latest_post, sender=Post, dispatch_uid="feed.record_latest_post", weak=False)
+    post_save.connect(count_unread_message, sender=DirectMessage, dispatch_uid="feed.count_unread_message", weak=False)
+    post_delete.connect(uncount_unread_message, sender=DirectMessage, dispatch_uid="feed.uncount_unread_message", weak=False)
+    post_save.connect(record_last_message, sender=DirectMessage, dispatch_uid="feed.record_last_message", weak=False)
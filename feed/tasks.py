@@ -0,0 +1,55 @@
+"""
+Background tasks run by the Celery worker
+"""
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from campusfeed_project.celery import app
+from .caching import record_media_send
+from .models import DirectMessage, PostImage
+from .views import deliver_message
+
+
+@app.task
+def attach_post_image(post_id, spooled_name, name, order):
+    """
+    Store an uploaded image spooled by create_post_page_view and attach it to
+    its post, then remove the spooled copy
+    """
+    try:
+        with default_storage.open(spooled_name) as f:
+            post_image = PostImage(post_id=post_id, order=order)
+            post_image.image.save(name, File(f), save=True)
+    finally:
+        default_storage.delete(spooled_name)
+
+
+@app.task
+def send_media_message(conversation_id, sender_id, recipient_id, content, post_id, voice_duration, spooled, token):
+    """
+    Store the media send_message spooled ({field name: (storage name, original name)}),
+    create the message, and push it to the conversation when realtime is on.
+    The outcome is recorded under token for the sender's page.
+    """
+    message = DirectMessage(
+        conversation_id=conversation_id,
+        sender_id=sender_id,
+        recipient_id=recipient_id,
+        content=content,
+        post_id=post_id,
+        voice_duration=voice_duration,
+    )
+    try:
+        for field_name, (spooled_name, name) in spooled.items():
+            with default_storage.open(spooled_name) as f:
+                getattr(message, field_name).save(name, File(f), save=False)
+        message.save()
+    except Exception:
+        record_media_send(token, sender_id, 'failed')
+        raise
+    finally:
+        for spooled_name, _ in spooled.values():
+            default_storage.delete(spooled_name)
+    
+    record_media_send(token, sender_id, 'sent')
+    deliver_message(message)
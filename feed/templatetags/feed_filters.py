@@ -1,50 +1,94 @@
 from django import template
 from django.utils import timezone
-from datetime import timedelta
+from feed.models import Post
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
 
 register = template.Library()
 
-@register.filter
-def smart_time(date):
+@register.filter(is_safe=True, expects_localtime=True)
+def smart_time(date, now=None):
     """
     Format time smartly:
     - < 1 day: "Xh" or "Xm"
     - 1-3 days: "1d", "2d", "3d"
     - > 3 days: "Jan 15, 2024 at 3:45 PM"
+    
+    Templates pass the per-render feed_now from the context processor;
+    without it the current time is used.
     """
     if not date:
         return ""
     
-    now = timezone.now()
-    diff = now - date
-    
-    # Less than 1 minute
-    if diff.total_seconds() < 60:
-        return "now"
-    
-    # Less than 1 hour
-    if diff.total_seconds() < 3600:
-        minutes = int(diff.total_seconds() / 60)
-        return f"{minutes}m"
-    
-    # Less than 24 hours
-    if diff.total_seconds() < 86400:
-        hours = int(diff.total_seconds() / 3600)
-        return f"{hours}h"
-    
-    # 1-3 days
-    if diff.days <= 3:
-        return f"{diff.days}d"
-    
-    # More than 3 days
-    return date.strftime("%b %d, %Y at %I:%M %p")
+    # Relative buckets come from the exact age; only the absolute date, which
+    # has minute precision, is worth caching
+    seconds = int((now or timezone.now()).timestamp() - date.timestamp())
+    bucket = bisect_right(SMART_TIME_THRESHOLDS, seconds)
+    if bucket < len(SMART_TIME_FORMATTERS):
+        return SMART_TIME_FORMATTERS[bucket](seconds)
+    return format_short_time(int(date.timestamp()) // 60, date.tzinfo)
+
+
+MONTH_NAMES = (
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+)
+
+
+def format_datetime(date, abbreviate_month=False):
+    """
+    Build "Jan 15, 2024 at 03:45 PM" directly, without strftime's
+    format parsing and locale lookups
+    """
+    month = MONTH_NAMES[date.month - 1]
+    if abbreviate_month:
+        month = month[:3]
+    hour = date.hour % 12 or 12
+    meridiem = 'AM' if date.hour < 12 else 'PM'
+    return f"{month} {date.day:02d}, {date.year} at {hour:02d}:{date.minute:02d} {meridiem}"
+
 
+# Upper bounds (seconds) for each relative smart_time bucket; index into
+# SMART_TIME_FORMATTERS, with anything older shown as an absolute date
+SMART_TIME_THRESHOLDS = (60, 3600, 86400, 4 * 86400)
+SMART_TIME_FORMATTERS = (
+    lambda seconds: "now",
+    lambda seconds: f"{seconds // 60}m",
+    lambda seconds: f"{seconds // 3600}h",
+    lambda seconds: f"{seconds // 86400}d",
+)
 
-@register.filter
+
+@lru_cache(maxsize=4096)
+def format_short_time(epoch_minute, tzinfo):
+    """
+    Cached absolute smart_time output; the format only has minute precision
+    """
+    return format_datetime(datetime.fromtimestamp(epoch_minute * 60, tz=tzinfo), abbreviate_month=True)
+
+
+@register.filter(is_safe=True, expects_localtime=True)
 def full_time(date):
     """
     Full time format for post details
     """
     if not date:
         return ""
-    return date.strftime("%B %d, %Y at %I:%M %p")
\ No newline at end of file
+    return format_full_time(int(date.timestamp()) // 60, date.tzinfo)
+
+
+@lru_cache(maxsize=2048)
+def format_full_time(epoch_minute, tzinfo):
+    """
+    Cached full_time output; the format only has minute precision
+    """
+    return format_datetime(datetime.fromtimestamp(epoch_minute * 60, tz=tzinfo))
+
+
+@register.filter(is_safe=True)
+def category_label(category):
+    """
+    Display label for a post category, from the dict built once on Post
+    """
+    return Post.CATEGORY_DISPLAY.get(category, category)
@@ -1,3 +1,435 @@
-from django.test import TestCase
+import importlib
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Comment, Conversation, DirectMessage, Like, Post
+
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class MessagePushTests(TestCase):
+    """Messages created by the DM endpoints reach sockets open on the conversation"""
+
+    def setUp(self):
+        cache.clear()
+        self.sender = User.objects.create_user('sender', password='pw')
+        self.recipient = User.objects.create_user('recipient', password='pw')
+        self.client.force_login(self.sender)
+
+        from channels.layers import get_channel_layer
+        from .realtime import conversation_group
+        from .views import find_conversation
+
+        self.layer = get_channel_layer()
+        conversation = find_conversation(self.sender.id, self.recipient.id, create=True)
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(conversation_group(conversation.id), self.channel)
+
+    def receive(self):
+        return async_to_sync(self.layer.receive)(self.channel)
+
+    def test_send_message_is_pushed(self):
+        response = self.client.post(reverse('send_message', args=['recipient']), {'content': 'hi'})
+
+        self.assertTrue(response.json()['success'])
+        event = self.receive()
+        self.assertEqual(event['sender_id'], self.sender.id)
+        self.assertEqual(event['message']['content'], 'hi')
+
+    def test_shared_post_is_pushed(self):
+        post = Post.objects.create(author=self.recipient, content='Worth a read')
+
+        response = self.client.post(
+            reverse('share_post_dm', args=[post.id]), {'username': 'recipient', 'message': 'look'}
+        )
+
+        self.assertTrue(response.json()['success'])
+        event = self.receive()
+        self.assertEqual(event['sender_id'], self.sender.id)
+        self.assertEqual(event['message']['content'], 'look')
+        self.assertEqual(event['message']['post']['id'], post.id)
+
+
+@override_settings(CELERY_BROKER_URL='memory://', SHARED_CACHE=True)
+class MediaMessageTests(TestCase):
+    """DMs whose media goes through the worker report back to their sender"""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_settings = self.settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        self.sender = User.objects.create_user('sender', password='pw')
+        self.recipient = User.objects.create_user('recipient', password='pw')
+        self.client.force_login(self.sender)
+
+    def send_image(self):
+        from .tasks import send_media_message
+
+        upload = SimpleUploadedFile('photo.jpg', b'not really a jpeg', content_type='image/jpeg')
+        with mock.patch.object(send_media_message, 'delay') as delay:
+            response = self.client.post(reverse('send_message', args=['recipient']), {'image': upload})
+        return response.json()['pending'], delay.call_args.args
+
+    def status(self, token):
+        return self.client.get(reverse('media_send_status', args=[token])).json()['status']
+
+    def test_sent_message_is_reported(self):
+        from .tasks import send_media_message
+
+        token, args = self.send_image()
+        self.assertEqual(self.status(token), 'pending')
+
+        send_media_message(*args)
+
+        self.assertEqual(self.status(token), 'sent')
+        self.assertEqual(DirectMessage.objects.filter(sender=self.sender).count(), 1)
+
+    def test_failed_message_is_reported(self):
+        from .tasks import send_media_message
+
+        token, args = self.send_image()
+        spooled = args[6]
+        default_storage.delete(spooled['image'][0])
+
+        with self.assertRaises(FileNotFoundError):
+            send_media_message(*args)
+
+        self.assertEqual(self.status(token), 'failed')
+        self.assertFalse(DirectMessage.objects.exists())
+
+    def test_status_is_private_to_the_sender(self):
+        token, _ = self.send_image()
+        self.client.force_login(self.recipient)
+
+        self.assertEqual(self.status(token), 'unknown')
+
+
+class PostCounterTriggerTests(TestCase):
+    """The database triggers from migration 0011 maintain likes_count and comments_count"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='pw')
+        self.post = Post.objects.create(author=self.user, content='Counted')
+
+    def counters(self):
+        self.post.refresh_from_db(fields=['likes_count', 'comments_count'])
+        return self.post.likes_count, self.post.comments_count
+
+    def test_like_insert_and_delete(self):
+        like = Like.objects.create(user=self.user, post=self.post)
+        self.assertEqual(self.counters(), (1, 0))
+
+        like.delete()
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_comment_insert_and_delete(self):
+        comment = Comment.objects.create(author=self.user, post=self.post, content='First')
+        Comment.objects.create(author=self.user, post=self.post, content='Second')
+        self.assertEqual(self.counters(), (0, 2))
+
+        comment.delete()
+        self.assertEqual(self.counters(), (0, 1))
+
+    def test_bulk_delete(self):
+        Like.objects.create(user=self.user, post=self.post)
+        Comment.objects.create(author=self.user, post=self.post, content='Gone soon')
+
+        Like.objects.filter(post=self.post).delete()
+        Comment.objects.filter(post=self.post).delete()
+        self.assertEqual(self.counters(), (0, 0))
+
+
+class FindConversationTests(TestCase):
+    """One conversation per user pair, created on first use"""
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', password='pw')
+        self.bob = User.objects.create_user('bob', password='pw')
+
+    def participant_rows(self):
+        Participant = Conversation.participants.through
+        return sorted(Participant.objects.values_list('conversation_id', 'user_id'))
+
+    def test_create_is_idempotent_across_pair_orderings(self):
+        from .views import find_conversation
+
+        self.assertIsNone(find_conversation(self.alice.id, self.bob.id))
+
+        first = find_conversation(self.alice.id, self.bob.id, create=True)
+        cache.clear()
+        second = find_conversation(self.bob.id, self.alice.id, create=True)
+        cache.clear()
+        found = find_conversation(self.bob.id, self.alice.id)
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(first.id, found.id)
+        self.assertEqual(Conversation.objects.count(), 1)
+
+    def test_participants_are_added_once(self):
+        from .views import find_conversation
+
+        conversation = find_conversation(self.alice.id, self.bob.id, create=True)
+        cache.clear()
+        find_conversation(self.bob.id, self.alice.id, create=True)
+
+        self.assertEqual(
+            self.participant_rows(),
+            [(conversation.id, self.alice.id), (conversation.id, self.bob.id)],
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', 'ON CONFLICT path is PostgreSQL only')
+    def test_insert_on_conflict_creates_once(self):
+        from .views import open_conversation
+
+        created_id, created = open_conversation(self.alice.id, self.bob.id)
+        self.assertTrue(created)
+
+        # A concurrent request that loses the insert gets the winner's row back
+        existing_id, created = open_conversation(self.alice.id, self.bob.id)
+        self.assertFalse(created)
+        self.assertEqual(existing_id, created_id)
+        self.assertEqual(Conversation.objects.count(), 1)
+
+    @skipUnless(connection.vendor == 'postgresql', 'ON CONFLICT path is PostgreSQL only')
+    def test_insert_on_conflict_finds_a_pair_created_elsewhere(self):
+        from .views import find_conversation
+
+        existing = Conversation.objects.create(user_low=self.alice, user_high=self.bob)
+
+        conversation = find_conversation(self.bob.id, self.alice.id, create=True)
+
+        self.assertEqual(conversation.id, existing.id)
+        self.assertEqual(Conversation.objects.count(), 1)
+        # The loser of the race leaves participants to the winner
+        self.assertEqual(self.participant_rows(), [])
+
+    def test_backfill_keeps_the_oldest_duplicate(self):
+        migration = importlib.import_module('feed.migrations.0018_backfill_participant_pairs')
+        carol = User.objects.create_user('carol', password='pw')
+        oldest, duplicate, other = (Conversation.objects.create() for _ in range(3))
+        oldest.participants.add(self.alice, self.bob)
+        duplicate.participants.add(self.bob, self.alice)
+        other.participants.add(self.alice, carol)
+
+        migration.backfill_participant_pairs(apps, None)
+
+        for conversation in (oldest, duplicate, other):
+            conversation.refresh_from_db()
+        self.assertEqual((oldest.user_low_id, oldest.user_high_id), (self.alice.id, self.bob.id))
+        self.assertEqual((duplicate.user_low_id, duplicate.user_high_id), (None, None))
+        self.assertEqual((other.user_low_id, other.user_high_id), (self.alice.id, carol.id))
+
+
+@override_settings(SHARED_CACHE=True)
+class GetNewMessagesTests(TestCase):
+    """Polling for new DMs, short-circuited from the cache when nothing was sent"""
+
+    def setUp(self):
+        cache.clear()
+        self.sender = User.objects.create_user('sender', password='pw')
+        self.recipient = User.objects.create_user('recipient', password='pw')
+        self.client.force_login(self.recipient)
+
+    def poll(self, since):
+        return self.client.get(reverse('get_new_messages', args=['sender']), {'since': since}).json()
+
+    def test_naive_since_is_read_in_the_current_time_zone(self):
+        from .views import find_conversation
+
+        conversation = find_conversation(self.sender.id, self.recipient.id, create=True)
+        before = timezone.localtime().replace(tzinfo=None) - timedelta(minutes=1)
+        DirectMessage.objects.create(
+            conversation=conversation, sender=self.sender, recipient=self.recipient, content='New'
+        )
+
+        data = self.poll(before.isoformat())
+
+        self.assertNotIn('error', data)
+        self.assertEqual([message['content'] for message in data['messages']], ['New'])
+
+
+@override_settings(SHARED_CACHE=True)
+class UnreadCountTests(TestCase):
+    """The navbar badge's cached unread counter"""
+
+    def setUp(self):
+        cache.clear()
+        self.sender = User.objects.create_user('sender', password='pw')
+        self.recipient = User.objects.create_user('recipient', password='pw')
+        self.client.force_login(self.recipient)
+
+    def unread_count(self):
+        return self.client.get(reverse('dm_unread_count')).json()['unread_count']
+
+    def send(self):
+        from .views import find_conversation
+
+        conversation = find_conversation(self.sender.id, self.recipient.id, create=True)
+        return DirectMessage.objects.create(
+            conversation=conversation, sender=self.sender, recipient=self.recipient, content='Hi'
+        )
+
+    def test_counter_follows_sends_and_deletes(self):
+        self.assertEqual(self.unread_count(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            message = self.send()
+            self.send()
+        self.assertEqual(self.unread_count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            message.delete()
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_rolled_back_send_is_not_counted(self):
+        from django.db import transaction
+
+        self.assertEqual(self.unread_count(), 0)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.send()
+                raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_negative_counter_is_recounted(self):
+        from .caching import adjust_unread_count, unread_count_key
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send()
+        self.assertEqual(self.unread_count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_unread_count(self.recipient.id, -2)
+
+        self.assertIsNone(cache.get(unread_count_key(self.recipient.id)))
+        self.assertEqual(self.unread_count(), 1)
+
+
+class ReadNewMessagesTests(TestCase):
+    """Polled messages come back as MESSAGE_ROW_FIELDS rows and are marked read"""
+
+    def setUp(self):
+        cache.clear()
+        self.sender = User.objects.create_user('sender', password='pw')
+        self.recipient = User.objects.create_user('recipient', password='pw')
+
+    def test_rows_and_marked_count(self):
+        from .views import find_conversation, read_new_messages
+
+        conversation = find_conversation(self.sender.id, self.recipient.id, create=True)
+        post = Post.objects.create(author=self.recipient, content='Post body')
+        already_read = DirectMessage.objects.create(
+            conversation=conversation, sender=self.sender, recipient=self.recipient, content='Seen', is_read=True
+        )
+        shared = DirectMessage.objects.create(
+            conversation=conversation, sender=self.sender, recipient=self.recipient, content='Message body', post=post
+        )
+
+        rows, marked = read_new_messages(conversation.messages.order_by('created_at'))
+        rows = {row['id']: row for row in rows}
+
+        self.assertEqual(marked, 1)
+        self.assertEqual(sorted(rows), [already_read.id, shared.id])
+        self.assertEqual(rows[shared.id]['content'], 'Message body')
+        self.assertEqual(rows[shared.id]['post__content'], 'Post body')
+        self.assertEqual(rows[shared.id]['post__author__username'], 'recipient')
+        self.assertFalse(DirectMessage.objects.filter(is_read=False).exists())
+
+
+@override_settings(SHARED_CACHE=True)
+class CheckNewPostsTests(TestCase):
+    """The new-posts banner count, short-circuited from the cache for idle categories"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reader', password='pw')
+        self.client.force_login(self.user)
+
+    def test_naive_since_is_read_in_the_current_time_zone(self):
+        author = User.objects.create_user('author', password='pw')
+        before = timezone.localtime().replace(tzinfo=None) - timedelta(minutes=1)
+        Post.objects.create(author=author, content='Fresh')
+
+        data = self.client.get(reverse('check_new_posts'), {'since': before.isoformat()}).json()
+
+        self.assertNotIn('error', data)
+        self.assertEqual(data['new_count'], 1)
+
+
+class LoadMorePostsTests(TestCase):
+    """Infinite scroll pages through the feed with a (created_at, id) cursor"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='pw')
+        self.client.force_login(self.user)
+
+    def load(self, **params):
+        return self.client.get(reverse('load_more_posts'), params)
+
+    def test_pages_through_posts_sharing_a_timestamp(self):
+        from .views import LOAD_MORE_PAGE_SIZE
+
+        Post.objects.bulk_create(
+            Post(author=self.user, content=f'Post {n}') for n in range(LOAD_MORE_PAGE_SIZE * 2 + 3)
+        )
+        Post.objects.update(created_at=timezone.now())
+
+        seen, params = [], {}
+        while True:
+            data = self.load(**params).json()
+            seen += [int(post_id) for post_id in re.findall(r'data-post-id="(\d+)"', data['html'])]
+            if not data['has_next']:
+                break
+            params = data['next_cursor']
+
+        expected = list(Post.objects.order_by('-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursor_is_rejected(self):
+        before = timezone.now().isoformat()
+
+        for before_id in ('', 'abc', '\u00b2'):
+            with self.subTest(before_id=before_id):
+                self.assertEqual(self.load(before=before, before_id=before_id).status_code, 400)
+        self.assertEqual(self.load(before='yesterday', before_id='1').status_code, 400)
+
+
+class CommentJsonTests(TestCase):
+    """The AJAX comment endpoints' JSON"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='pw')
+        self.post = Post.objects.create(author=self.user, content='Discussed')
+        self.client.force_login(self.user)
+
+    def test_created_at_is_local_time(self):
+        response = self.client.post(reverse('add_comment', args=[self.post.id]), {'content': 'First'})
+
+        comment = Comment.objects.get()
+        local = timezone.localtime(comment.created_at).strftime('%B %d, %Y %I:%M %p')
+        self.assertEqual(response.json()['comment']['created_at'], local)
+        listed = self.client.get(reverse('get_comments', args=[self.post.id])).json()
+        self.assertEqual(listed['comments'][0]['created_at'], local)
@@ -0,0 +1,11 @@
+"""
+Polling endpoints for the feed, mounted under api/posts/
+"""
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('check-new/', views.check_new_posts, name='check_new_posts'),
+    path('load-new/', views.load_new_posts, name='load_new_posts'),
+    path('load-more/', views.load_more_posts, name='load_more_posts'),
+]
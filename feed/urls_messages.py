@@ -0,0 +1,18 @@
+"""
+Direct message endpoints, mounted under messages/
+"""
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.messages_inbox, name='messages_inbox'),
+    path('unread-count/', views.get_unread_count, name='dm_unread_count'),
+    path('search-users/', views.search_users_dm, name='search_users_dm'),
+    path('message/<int:message_id>/delete/', views.delete_message, name='delete_message'),
+    path('message/pending/<str:token>/', views.media_send_status, name='media_send_status'),
+    path('<str:username>/', views.conversation_view, name='conversation'),
+    path('<str:username>/send/', views.send_message, name='send_message'),
+    path('<str:username>/new/', views.get_new_messages, name='get_new_messages'),
+    path('<str:username>/older/', views.load_older_messages, name='load_older_messages'),
+    path('<str:username>/mark-read/', views.mark_conversation_read, name='mark_conversation_read'),
+]
@@ -0,0 +1,16 @@
+"""
+Post action endpoints, mounted under posts/
+"""
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('<pid:post_id>/like/', views.toggle_like_view, name='toggle_like'),
+    path('<pid:post_id>/bookmark/', views.toggle_bookmark_view, name='toggle_bookmark'),
+    path('<pid:post_id>/comments/', views.get_comments_view, name='get_comments'),
+    path('<pid:post_id>/comment/', views.add_comment_view, name='add_comment'),
+    path('<pid:post_id>/share-dm/', views.share_post_dm, name='share_post_dm'),
+    path('<pid:post_id>/share/', views.get_share_link_view, name='get_share_link'),
+    path('create/', views.create_post_view, name='create_post'),
+    path('new/', views.create_post_page_view, name='create_post_page'),
+]
@@ -1,17 +1,47 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
 from django.core.paginator import Paginator
-from django.db.models import Count, Q
+from django.db.models import CharField, Count, F, Prefetch, Q, TextField, Value
 from django.utils import timezone
 from datetime import timedelta
+from .caching import (
+    DM_CONVERSATION_TTL, LAST_MESSAGE_TTL, NEW_POSTS_COUNT_TTL, UNREAD_COUNT_TTL, adjust_unread_count,
+    dm_conversation_key, last_message_key, latest_post_key, media_send_key, new_posts_count_key,
+    record_media_send, resolve_user_id, unread_count_key,
+)
 from .forms import UserRegistrationForm, UserLoginForm, ProfileUpdateForm, PostForm
-from .models import Post, Like, Comment, Bookmark, PostImage, DirectMessage, PostShare, Follow
+from .models import Post, Like, Comment, Bookmark, PostImage, DirectMessage, PostShare, Follow, UserProfile
 import json
+import os
+import uuid
+
+def parse_page(page):
+    """1-based page number from a query string value, falling back to 1"""
+    try:
+        return max(int(page), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def cheap_page(queryset, page, size=10):
+    """
+    Slice out one page without Paginator's COUNT, fetching one extra row to
+    tell whether another page exists. Returns (rows, has_next).
+    """
+    page = parse_page(page)
+    rows = list(queryset[(page - 1) * size:page * size + 1])
+    return rows[:size], len(rows) > size
+
 
 def home(request):
     """
@@ -100,32 +130,23 @@ def feed_view(request):
     
     # Apply search filter if query exists
     if search_query:
-        posts = posts.filter(content__icontains=search_query)
+        posts = posts.search(search_query)
     
-    # Get posts with related data to reduce queries
-    posts = posts.select_related('author', 'author__profile').prefetch_related('likes', 'comments')
+    # Get posts with related data and the user's like/bookmark state to reduce queries
+    posts = posts.for_listing().with_user_state(request.user).prefetch_related('images')
     
-    # Pagination
-    paginator = Paginator(posts, 10)  # 10 posts per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Get post IDs that current user has liked
-    liked_post_ids = Like.objects.filter(user=request.user).values_list('post_id', flat=True)
-    
-    # Get post IDs that current user has bookmarked
-    bookmarked_post_ids = Bookmark.objects.filter(user=request.user).values_list('post_id', flat=True)
+    # First page only; later pages come from load_more_posts, so skip the COUNT
+    page_posts, has_next = cheap_page(posts, request.GET.get('page'))
     
     # Create post form
     form = PostForm()
     
     context = {
         'form': form,
-        'posts': page_obj,
+        'posts': page_posts,
+        'has_next': has_next,
         'category': category,
         'categories': Post.CATEGORY_CHOICES,
-        'liked_post_ids': list(liked_post_ids),
-        'bookmarked_post_ids': list(bookmarked_post_ids),
         'search_query': search_query,
     }
     
@@ -151,29 +172,12 @@ def profile_view(request):
     total_likes_received = Like.objects.filter(post__author=request.user).count()
     total_comments = Comment.objects.filter(author=request.user).count()
     
-    # Get user's posts
-    posts = Post.objects.filter(author=request.user).select_related(
-        'author', 'author__profile'
-    ).prefetch_related('likes', 'comments', 'images').order_by('-created_at')
-    
-    # Pagination
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Get post IDs that current user has liked and bookmarked
-    liked_post_ids = Like.objects.filter(user=request.user).values_list('post_id', flat=True)
-    bookmarked_post_ids = Bookmark.objects.filter(user=request.user).values_list('post_id', flat=True)
-    
     context = {
         'form': form,
         'user': request.user,
         'total_posts': total_posts,
         'total_likes_received': total_likes_received,
         'total_comments': total_comments,
-        'posts': page_obj,
-        'liked_post_ids': list(liked_post_ids),
-        'bookmarked_post_ids': list(bookmarked_post_ids),
     }
     
     return render(request, 'feed/profile.html', context)
@@ -193,6 +197,7 @@ def create_post_view(request):
         # Set author (even for anonymous posts, we track who posted)
         post.author = request.user
         post.save()
+        form.save_images(post)
         
         # Get author info for response
         author_info = post.get_author_info()
@@ -204,11 +209,11 @@ def create_post_view(request):
                 'id': post.id,
                 'content': post.content,
                 'image_url': post.image.url if post.image else None,
-                'category': post.get_category_display(),
+                'category': Post.CATEGORY_DISPLAY.get(post.category, post.category),
                 'category_value': post.category,
                 'is_anonymous': post.is_anonymous,
                 'author': author_info,
-                'created_at': post.created_at.strftime('%B %d, %Y %I:%M %p'),
+                'created_at': timezone.localtime(post.created_at).strftime('%B %d, %Y %I:%M %p'),
                 'likes_count': post.likes_count,
                 'comments_count': post.comments_count,
             }
@@ -226,61 +231,63 @@ def toggle_like_view(request, post_id):
     """
     Toggle like on a post via AJAX
     """
-    post = get_object_or_404(Post, id=post_id)
-    
-    # Check if user already liked the post
-    like = Like.objects.filter(user=request.user, post=post).first()
+    post = get_object_or_404(Post.objects.only('id', 'likes_count'), id=post_id)
     
-    if like:
-        # Unlike the post
-        like.delete()
+    # Unlike if a like existed, otherwise like the post
+    deleted, _ = Like.objects.filter(user=request.user, post=post).delete()
+    if deleted:
         liked = False
     else:
-        # Like the post
         Like.objects.create(user=request.user, post=post)
         liked = True
     
-    # Get updated like count
-    post.refresh_from_db()
+    # The counter trigger applied the same delta; no need to re-read the row
+    likes_count = post.likes_count + (1 if liked else -1)
     
     return JsonResponse({
         'success': True,
         'liked': liked,
-        'likes_count': post.likes_count
+        'likes_count': likes_count
     })
 
 
+def comment_author_info(comment, profile=None):
+    """Build the author block for a serialized comment from precomputed display lookups"""
+    author_info = {
+        'username': comment.get_author_display(),
+        'is_anonymous': comment.is_anonymous
+    }
+    
+    # Add department and level if not anonymous
+    if not comment.is_anonymous and profile is not None:
+        author_info['department'] = UserProfile.DEPARTMENT_DISPLAY.get(profile.department, profile.department)
+        author_info['level'] = UserProfile.LEVEL_DISPLAY.get(profile.level, profile.level)
+    
+    return author_info
+
+
 @login_required
-def get_comments_view(request, post_id):
+async def get_comments_view(request, post_id):
     """
     Get comments for a post via AJAX
     """
-    post = get_object_or_404(Post, id=post_id)
+    user = await request.auser()
+    post = await aget_object_or_404(Post.objects.only('id'), id=post_id)
     comments = post.comments.select_related('author', 'author__profile').all()
     
-    comments_data = []
-    for comment in comments:
-        author_info = {
-            'username': comment.get_author_display(),
-            'is_anonymous': comment.is_anonymous
-        }
-        
-        # Add department and level if not anonymous
-        if not comment.is_anonymous and comment.author:
-            try:
-                profile = comment.author.profile
-                author_info['department'] = profile.get_department_display() if profile.department else ''
-                author_info['level'] = profile.get_level_display() if profile.level else ''
-            except:
-                pass
-        
-        comments_data.append({
+    comments_data = [
+        {
             'id': comment.id,
             'content': comment.content,
-            'author': author_info,
-            'created_at': comment.created_at.strftime('%B %d, %Y %I:%M %p'),
-            'is_own_comment': comment.author == request.user if comment.author else False
-        })
+            'author': comment_author_info(
+                comment,
+                getattr(comment.author, 'profile', None) if comment.author else None
+            ),
+            'created_at': timezone.localtime(comment.created_at).strftime('%B %d, %Y %I:%M %p'),
+            'is_own_comment': comment.author_id is not None and comment.author_id == user.id
+        }
+        async for comment in comments
+    ]
     
     return JsonResponse({
         'success': True,
@@ -294,7 +301,7 @@ def add_comment_view(request, post_id):
     """
     Add a comment to a post via AJAX
     """
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.only('id', 'comments_count'), id=post_id)
     
     content = request.POST.get('content', '').strip()
     is_anonymous = request.POST.get('is_anonymous') == 'true'
@@ -317,22 +324,8 @@ def add_comment_view(request, post_id):
         video=video
     )
     
-    # Get updated comment count
-    post.refresh_from_db()
-    
     # Prepare author info
-    author_info = {
-        'username': comment.get_author_display(),
-        'is_anonymous': comment.is_anonymous
-    }
-    
-    if not is_anonymous:
-        try:
-            profile = request.user.profile
-            author_info['department'] = profile.get_department_display() if profile.department else ''
-            author_info['level'] = profile.get_level_display() if profile.level else ''
-        except:
-            pass
+    author_info = comment_author_info(comment, getattr(request.user, 'profile', None))
     
     return JsonResponse({
         'success': True,
@@ -340,12 +333,12 @@ def add_comment_view(request, post_id):
             'id': comment.id,
             'content': comment.content,
             'author': author_info,
-            'created_at': comment.created_at.strftime('%B %d, %Y %I:%M %p'),
+            'created_at': timezone.localtime(comment.created_at).strftime('%B %d, %Y %I:%M %p'),
             'is_own_comment': True,
             'image_url': comment.image.url if comment.image else None,
             'video_url': comment.video.url if comment.video else None,
         },
-        'comments_count': post.comments_count
+        'comments_count': post.comments_count + 1
     })
 
 
@@ -355,24 +348,21 @@ def delete_comment_view(request, comment_id):
     """
     Delete a comment via AJAX
     """
-    comment = get_object_or_404(Comment, id=comment_id)
+    comment = get_object_or_404(Comment.objects.select_related('post'), id=comment_id)
     
     # Check if user owns the comment
-    if comment.author != request.user:
+    if comment.author_id != request.user.id:
         return JsonResponse({
             'success': False,
             'error': 'You can only delete your own comments'
         }, status=403)
     
-    post = comment.post
+    comments_count = comment.post.comments_count - 1
     comment.delete()
     
-    # Get updated comment count
-    post.refresh_from_db()
-    
     return JsonResponse({
         'success': True,
-        'comments_count': post.comments_count
+        'comments_count': comments_count
     })
 
 
@@ -384,27 +374,23 @@ def trending_view(request):
     # Get posts from last 24 hours
     last_24h = timezone.now() - timedelta(hours=24)
     
-    # Calculate engagement score (likes * 2 + comments * 3)
+    # Calculate engagement score (likes * 2 + comments * 3) from the stored counters
     trending_posts = Post.objects.filter(
         created_at__gte=last_24h
     ).annotate(
-        engagement_score=Count('likes') * 2 + Count('comments') * 3
+        engagement_score=F('likes_count') * 2 + F('comments_count') * 3
     ).order_by('-engagement_score', '-created_at')[:20]
     
     # Get posts with related data
-    trending_posts = trending_posts.select_related('author', 'author__profile').prefetch_related('likes', 'comments')
+    trending_posts = trending_posts.for_listing().with_user_state(request.user).prefetch_related('images')
     
     # Pagination
     paginator = Paginator(trending_posts, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get post IDs that current user has liked
-    liked_post_ids = Like.objects.filter(user=request.user).values_list('post_id', flat=True)
-    
     context = {
         'posts': page_obj,
-        'liked_post_ids': list(liked_post_ids),
         'is_trending': True,
     }
     
@@ -416,44 +402,31 @@ def notifications_view(request):
     """
     Show user notifications
     """
-    # Get posts where user received likes
-    user_posts = Post.objects.filter(author=request.user)
+    # Likes and comments on the user's posts, merged and ordered in one UNION query.
+    # Each side carries the display columns the template needs, so rows render as-is
     recent_likes = Like.objects.filter(
-        post__in=user_posts
+        post__author=request.user
     ).exclude(
         user=request.user
-    ).select_related('user', 'post').order_by('-created_at')[:20]
+    ).annotate(
+        kind=Value('like', output_field=CharField()),
+        username=F('user__username'),
+        text=Value('', output_field=TextField()),
+        post_content=F('post__content'),
+    ).values('kind', 'username', 'post_id', 'text', 'post_content', 'created_at').order_by()
     
-    # Get comments on user's posts
     recent_comments = Comment.objects.filter(
-        post__in=user_posts
+        post__author=request.user
     ).exclude(
         author=request.user
-    ).select_related('author', 'post').order_by('-created_at')[:20]
-    
-    # Combine and sort by time
-    notifications = []
-    
-    for like in recent_likes:
-        notifications.append({
-            'type': 'like',
-            'user': like.user,
-            'post': like.post,
-            'created_at': like.created_at,
-        })
-    
-    for comment in recent_comments:
-        notifications.append({
-            'type': 'comment',
-            'user': comment.author,
-            'post': comment.post,
-            'content': comment.content,
-            'created_at': comment.created_at,
-        })
+    ).annotate(
+        kind=Value('comment', output_field=CharField()),
+        username=F('author__username'),
+        text=F('content'),
+        post_content=F('post__content'),
+    ).values('kind', 'username', 'post_id', 'text', 'post_content', 'created_at').order_by()
     
-    # Sort by created_at
-    notifications.sort(key=lambda x: x['created_at'], reverse=True)
-    notifications = notifications[:30]
+    notifications = list(recent_likes.union(recent_comments, all=True).order_by('-created_at')[:30])
     
     context = {
         'notifications': notifications,
@@ -468,17 +441,13 @@ def toggle_bookmark_view(request, post_id):
     """
     Toggle bookmark on a post via AJAX
     """
-    post = get_object_or_404(Post, id=post_id)
-    
-    # Check if user already bookmarked the post
-    bookmark = Bookmark.objects.filter(user=request.user, post=post).first()
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
     
-    if bookmark:
-        # Remove bookmark
-        bookmark.delete()
+    # Remove the bookmark if it existed, otherwise add it
+    deleted, _ = Bookmark.objects.filter(user=request.user, post=post).delete()
+    if deleted:
         bookmarked = False
     else:
-        # Add bookmark
         Bookmark.objects.create(user=request.user, post=post)
         bookmarked = True
     
@@ -493,34 +462,34 @@ def bookmarks_view(request):
     """
     Show user's bookmarked posts
     """
-    bookmarks = Bookmark.objects.filter(user=request.user).select_related(
-        'post', 'post__author', 'post__author__profile'
-    ).prefetch_related('post__likes', 'post__comments')
-    
-    # Get just the posts
-    posts = [bookmark.post for bookmark in bookmarks]
+    # Every post here is bookmarked, so only the like state needs annotating
+    posts = Post.objects.bookmarked_by(request.user).for_listing().with_liked(
+        request.user
+    ).prefetch_related('images')
     
     # Pagination
     paginator = Paginator(posts, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get post IDs that current user has liked
-    liked_post_ids = Like.objects.filter(user=request.user).values_list('post_id', flat=True)
-    
-    # Get bookmarked post IDs
-    bookmarked_post_ids = [post.id for post in posts]
-    
     context = {
         'posts': page_obj,
-        'liked_post_ids': list(liked_post_ids),
-        'bookmarked_post_ids': bookmarked_post_ids,
         'is_bookmarks': True,
     }
     
     return render(request, 'feed/bookmarks.html', context)
 
 
+def spool_upload(upload):
+    """
+    Stage an uploaded file in the storage backend under UPLOAD_SPOOL_LOCATION,
+    where the worker can read it wherever it runs. Returns (storage name, original name)
+    """
+    suffix = os.path.splitext(upload.name)[1]
+    name = default_storage.save(f'{settings.UPLOAD_SPOOL_LOCATION}/{uuid.uuid4().hex}{suffix}', upload)
+    return name, upload.name
+
+
 @login_required
 def create_post_page_view(request):
     """
@@ -560,11 +529,26 @@ def create_post_page_view(request):
             is_anonymous=is_anonymous,
             video=video if video else None
         )
-        post.save()
         
-        # Save multiple images with order
-        for idx, image in enumerate(images):
-            PostImage.objects.create(post=post, image=image, order=idx)
+        if settings.CELERY_BROKER_URL and images:
+            # Spool the uploads and let the worker do the storage writes
+            from .tasks import attach_post_image
+            
+            spooled = [spool_upload(image) for image in images]
+            with transaction.atomic():
+                post.save()
+                for idx, (spooled_name, name) in enumerate(spooled):
+                    transaction.on_commit(
+                        lambda args=(post.id, spooled_name, name, idx): attach_post_image.delay(*args)
+                    )
+        else:
+            # Save the post and its ordered images together
+            with transaction.atomic():
+                post.save()
+                PostImage.objects.bulk_create([
+                    PostImage(post=post, image=image, order=idx)
+                    for idx, image in enumerate(images)
+                ])
         
         messages.success(request, 'Post created successfully! 🎉')
         return redirect('feed')
@@ -579,7 +563,7 @@ def toggle_follow_view(request, user_id):
     """
     Follow/Unfollow a user
     """
-    user_to_follow = get_object_or_404(User, id=user_id)
+    user_to_follow = get_object_or_404(User.objects.only('id'), id=user_id)
     
     if user_to_follow == request.user:
         return JsonResponse({
@@ -587,16 +571,16 @@ def toggle_follow_view(request, user_id):
             'error': 'You cannot follow yourself'
         }, status=400)
     
-    follow = Follow.objects.filter(follower=request.user, following=user_to_follow).first()
-    
-    if follow:
-        follow.delete()
-        following = False
-    else:
-        Follow.objects.create(follower=request.user, following=user_to_follow)
-        following = True
-    
-    followers_count = Follow.objects.filter(following=user_to_follow).count()
+    # Toggle and count in one transaction so the count reflects this write
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(follower=request.user, following=user_to_follow).delete()
+        if deleted:
+            following = False
+        else:
+            Follow.objects.create(follower=request.user, following=user_to_follow)
+            following = True
+        
+        followers_count = Follow.objects.filter(following=user_to_follow).count()
     
     return JsonResponse({
         'success': True,
@@ -613,43 +597,33 @@ def public_profile_view(request, username):
     profile_user = get_object_or_404(User, username=username)
     
     # Get user's posts
-    posts = Post.objects.filter(author=profile_user).select_related(
-        'author', 'author__profile'
-    ).prefetch_related('likes', 'comments', 'images')
+    posts = Post.objects.filter(author=profile_user).for_listing().with_user_state(
+        request.user
+    ).prefetch_related('images')
     
     # Pagination
     paginator = Paginator(posts, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get stats
-    total_posts = posts.count()
-    followers_count = Follow.objects.filter(following=profile_user).count()
-    following_count = Follow.objects.filter(follower=profile_user).count()
-    
-    # Check if current user follows this user
-    is_following = Follow.objects.filter(
-        follower=request.user, 
-        following=profile_user
-    ).exists() if request.user.is_authenticated else False
-    
-    # Get post IDs that current user has liked
-    liked_post_ids = []
-    bookmarked_post_ids = []
-    if request.user.is_authenticated:
-        liked_post_ids = Like.objects.filter(user=request.user).values_list('post_id', flat=True)
-        bookmarked_post_ids = Bookmark.objects.filter(user=request.user).values_list('post_id', flat=True)
+    # Follower/following counts and the viewer's follow state in one query
+    follow_stats = Follow.objects.filter(
+        Q(following=profile_user) | Q(follower=profile_user)
+    ).aggregate(
+        followers_count=Count('id', filter=Q(following=profile_user)),
+        following_count=Count('id', filter=Q(follower=profile_user)),
+        viewer_follows=Count('id', filter=Q(follower=request.user, following=profile_user)),
+    )
     
     context = {
         'profile_user': profile_user,
         'posts': page_obj,
-        'total_posts': total_posts,
-        'followers_count': followers_count,
-        'following_count': following_count,
-        'is_following': is_following,
+        # The paginator already ran the COUNT for this queryset
+        'total_posts': paginator.count,
+        'followers_count': follow_stats['followers_count'],
+        'following_count': follow_stats['following_count'],
+        'is_following': follow_stats['viewer_follows'] > 0,
         'is_own_profile': request.user == profile_user,
-        'liked_post_ids': list(liked_post_ids),
-        'bookmarked_post_ids': list(bookmarked_post_ids),
     }
     
     return render(request, 'feed/public_profile.html', context)
@@ -661,23 +635,20 @@ def post_detail_view(request, post_id):
     View detailed post page
     """
     post = get_object_or_404(
-        Post.objects.select_related('author', 'author__profile').prefetch_related(
-            'likes', 'comments', 'comments__author', 'images'
+        Post.objects.with_author().with_user_state(request.user).prefetch_related(
+            Prefetch('comments', queryset=Comment.objects.select_related('author', 'author__profile')),
+            'images'
         ),
         id=post_id
     )
     
-    # Check if user liked/bookmarked
-    user_liked = Like.objects.filter(user=request.user, post=post).exists()
-    user_bookmarked = Bookmark.objects.filter(user=request.user, post=post).exists()
-    
-    # Get all comments
-    comments = post.comments.select_related('author', 'author__profile').all()
+    # Comments come from the prefetch above
+    comments = post.comments.all()
     
     context = {
         'post': post,
-        'user_liked': user_liked,
-        'user_bookmarked': user_bookmarked,
+        'user_liked': post.is_liked,
+        'user_bookmarked': post.is_bookmarked,
         'comments': comments,
         'is_owner': request.user == post.author,
     }
@@ -759,9 +730,9 @@ def search(request):
             
         else:
             # Base query for posts
-            posts = Post.objects.filter(
-                content__icontains=query
-            ).select_related('author', 'author__profile').prefetch_related('likes', 'comments')
+            posts = Post.objects.search(query).for_listing().with_user_state(
+                request.user
+            ).prefetch_related('images')
             
             if tab == 'latest':
                 posts = posts.order_by('-created_at')
@@ -779,20 +750,17 @@ def search(request):
                 ).order_by('-followers_count')[:3].select_related('profile')
 
                 posts = posts.annotate(
-                    engagement=Count('likes') + Count('comments')
-                ).order_by('-engagement', '-created_at')
+                    engagement=F('likes_count') + F('comments_count')
+                ).order_by('-search_rank', '-engagement', '-created_at')
             
             paginator = Paginator(posts, 10)
             page_number = request.GET.get('page')
             posts = paginator.get_page(page_number)
     
-    liked_post_ids = Like.objects.filter(user=request.user).values_list('post_id', flat=True)
-    
     context = {
         'posts': posts,
         'users': users,
         'top_users': top_users,
-        'liked_post_ids': list(liked_post_ids),
         'search_query': query,
         'current_tab': tab,
         'following_users': following_users,
@@ -807,7 +775,7 @@ from django.utils.dateparse import parse_datetime
 from django.contrib.auth.decorators import login_required
 
 @login_required
-def check_new_posts(request):
+async def check_new_posts(request):
     """Check if new posts exist since the given timestamp"""
     since = request.GET.get('since')
     category = request.GET.get('category', 'all')
@@ -816,24 +784,49 @@ def check_new_posts(request):
         return JsonResponse({'new_count': 0})
     
     try:
+        user = await request.auser()
         since_dt = parse_datetime(since)
-        queryset = Post.objects.filter(created_at__gt=since_dt)
+        # Compared with the aware cached latest post time below, so read an
+        # offset-less timestamp in the current time zone
+        if timezone.is_naive(since_dt):
+            since_dt = timezone.make_aware(since_dt)
+        category = category or 'all'
         
-        # Exclude user's own posts from notification
-        queryset = queryset.exclude(author=request.user)
+        # Nothing has been posted in this category since the client's timestamp
+        # (see settings.SHARED_CACHE)
+        latest_post_at = None
+        if settings.SHARED_CACHE:
+            latest_post_at = await cache.aget(latest_post_key(category))
+        if latest_post_at is not None and latest_post_at <= since_dt:
+            return JsonResponse({'new_count': 0})
         
-        # Filter by category if not 'all'
-        if category and category != 'all':
-            queryset = queryset.filter(category=category)
+        count_key = new_posts_count_key(user.id, category, since_dt, latest_post_at)
+        new_count = await cache.aget(count_key)
+        if new_count is None:
+            queryset = Post.objects.filter(created_at__gt=since_dt)
+            
+            # Exclude user's own posts from notification
+            queryset = queryset.exclude(author=user)
+            
+            # Filter by category if not 'all'
+            if category != 'all':
+                queryset = queryset.filter(category=category)
+            
+            new_count = await queryset.acount()
+            await cache.aset(count_key, new_count, NEW_POSTS_COUNT_TTL)
         
-        return JsonResponse({'new_count': queryset.count()})
+        return JsonResponse({'new_count': new_count})
     
     except Exception as e:
         return JsonResponse({'new_count': 0, 'error': str(e)})
 
 
+# Most posts load_new_posts will return in one response
+LOAD_NEW_POSTS_LIMIT = 50
+
+
 @login_required
-def load_new_posts(request):
+async def load_new_posts(request):
     """Load new posts since timestamp and return rendered HTML"""
     since = request.GET.get('since')
     category = request.GET.get('category', 'all')
@@ -842,6 +835,7 @@ def load_new_posts(request):
         return JsonResponse({'html': '', 'count': 0})
     
     try:
+        user = await request.auser()
         since_dt = parse_datetime(since)
         queryset = Post.objects.filter(created_at__gt=since_dt)
         
@@ -849,34 +843,24 @@ def load_new_posts(request):
         if category and category != 'all':
             queryset = queryset.filter(category=category)
         
-        posts = queryset.select_related('author', 'author__profile').prefetch_related('likes', 'comments').order_by('-created_at')
-        
-        # Get liked/bookmarked status for current user
-        liked_post_ids = list(Like.objects.filter(
-            user=request.user, 
-            post__in=posts
-        ).values_list('post_id', flat=True))
-        
-        bookmarked_post_ids = list(Bookmark.objects.filter(
-            user=request.user, 
-            post__in=posts
-        ).values_list('post_id', flat=True))
+        # Evaluate once, capped so a long-idle tab can't pull thousands of rows
+        posts = [
+            post async for post in queryset.for_listing().with_user_state(user).prefetch_related(
+                'images'
+            ).order_by('-created_at')[:LOAD_NEW_POSTS_LIMIT]
+        ]
         
         # Render posts to HTML using a partial template
-        html = render_to_string('feed/partials/post_list.html', {
+        html = await sync_to_async(render_to_string)('feed/partials/post_list.html', {
             'posts': posts,
-            'liked_post_ids': liked_post_ids,
-            'bookmarked_post_ids': bookmarked_post_ids,
         }, request=request)
         
         # Get the latest post timestamp
-        latest_timestamp = None
-        if posts.exists():
-            latest_timestamp = posts.first().created_at.isoformat()
+        latest_timestamp = posts[0].created_at.isoformat() if posts else None
         
         return JsonResponse({
             'html': html,
-            'count': posts.count(),
+            'count': len(posts),
             'latest_timestamp': latest_timestamp
         })
     
@@ -885,89 +869,208 @@ def load_new_posts(request):
 
 
     
+# Posts per infinite-scroll batch
+LOAD_MORE_PAGE_SIZE = 10
+
+
 @login_required
 def load_more_posts(request):
-    """Load more posts for infinite scroll"""
-    page = request.GET.get('page', 1)
+    """Load more posts for infinite scroll, continuing after the (before, before_id) cursor"""
+    before = request.GET.get('before')
+    before_id = request.GET.get('before_id')
     category = request.GET.get('category', 'all')
     search_query = request.GET.get('q', '').strip()
     
-    try:
-        # Get posts based on filters
-        if category == 'all' or not category:
-            posts = Post.objects.all()
-        else:
-            posts = Post.objects.filter(category=category)
-        
-        # Apply search filter
-        if search_query:
-            posts = posts.filter(content__icontains=search_query)
-        
-        posts = posts.select_related('author', 'author__profile').prefetch_related('likes', 'comments')
-        
-        # Paginate
-        paginator = Paginator(posts, 10)
-        page_obj = paginator.get_page(page)
-        
-        # Get liked/bookmarked status
-        post_ids = [p.id for p in page_obj]
-        liked_post_ids = list(Like.objects.filter(
-            user=request.user,
-            post_id__in=post_ids
-        ).values_list('post_id', flat=True))
-        
-        bookmarked_post_ids = list(Bookmark.objects.filter(
-            user=request.user,
-            post_id__in=post_ids
-        ).values_list('post_id', flat=True))
-        
-        # Render HTML
-        html = render_to_string('feed/partials/post_list_infinite.html', {
-            'posts': page_obj,
-            'liked_post_ids': liked_post_ids,
-            'bookmarked_post_ids': bookmarked_post_ids,
-        }, request=request)
-        
-        return JsonResponse({
-            'html': html,
-            'has_next': page_obj.has_next(),
-            'next_page': page_obj.next_page_number() if page_obj.has_next() else None,
-            'total_pages': paginator.num_pages,
-        })
-        
-    except Exception as e:
-        return JsonResponse({'html': '', 'has_next': False, 'error': str(e)})
+    # Validate the cursor up front; a half or malformed one is a client bug
+    before_dt = None
+    if before or before_id:
+        try:
+            before_dt = parse_datetime(before or '')
+            before_pk = int(before_id or '')
+        except ValueError:
+            before_dt = None
+        if before_dt is None:
+            return JsonResponse({'html': '', 'has_next': False, 'error': 'Invalid cursor'}, status=400)
+    
+    # Get posts based on filters
+    if category == 'all' or not category:
+        posts = Post.objects.all()
+    else:
+        posts = Post.objects.filter(category=category)
+    
+    # Apply search filter
+    if search_query:
+        posts = posts.search(search_query)
+    
+    # Keyset pagination: only posts strictly older than the last one the client has
+    if before_dt is not None:
+        posts = posts.filter(
+            Q(created_at__lt=before_dt) | Q(created_at=before_dt, id__lt=before_pk)
+        )
+    
+    posts = posts.for_listing().with_user_state(request.user).prefetch_related('images').order_by('-created_at', '-id')
+    
+    # Fetch one extra row to know whether another page exists
+    page_posts = list(posts[:LOAD_MORE_PAGE_SIZE + 1])
+    has_next = len(page_posts) > LOAD_MORE_PAGE_SIZE
+    page_posts = page_posts[:LOAD_MORE_PAGE_SIZE]
+    
+    # Render HTML
+    html = render_to_string('feed/partials/post_list_infinite.html', {
+        'posts': page_posts,
+    }, request=request)
     
+    next_cursor = None
+    if has_next:
+        last_post = page_posts[-1]
+        next_cursor = {'before': last_post.created_at.isoformat(), 'before_id': last_post.id}
+    
+    return JsonResponse({
+        'html': html,
+        'has_next': has_next,
+        'next_cursor': next_cursor,
+    })
+
 
 from django.db.models import Q, Max, Count, OuterRef, Subquery
 from .models import Conversation, DirectMessage
 
+def user_id_or_404(username):
+    """Id of the user with this username via the cached map, for views that need nothing else"""
+    user_id = resolve_user_id(username)
+    if user_id is None:
+        raise Http404('No User matches the given query.')
+    return user_id
+
+
+def find_conversation(user_id, other_user_id, create=False):
+    """
+    Return the conversation between two users, creating it when create=True
+    (None otherwise). The id is cached per user pair, so repeat lookups skip
+    the database and get back an id-only instance.
+    """
+    key = dm_conversation_key(user_id, other_user_id)
+    conversation_id = cache.get(key)
+    if conversation_id is not None:
+        return Conversation.from_db(Conversation.objects.db, ['id'], [conversation_id])
+    
+    if create:
+        user_low_id, user_high_id = sorted((user_id, other_user_id))
+        with transaction.atomic():
+            conversation_id, created = open_conversation(user_low_id, user_high_id)
+            if created:
+                Participant = Conversation.participants.through
+                Participant.objects.bulk_create([
+                    Participant(conversation_id=conversation_id, user_id=participant_id)
+                    for participant_id in (user_low_id, user_high_id)
+                ])
+        conversation = Conversation.from_db(Conversation.objects.db, ['id'], [conversation_id])
+    else:
+        conversation = Conversation.objects.between(user_id, other_user_id).only('id').first()
+        if conversation is None:
+            return None
+    
+    cache.set(key, conversation.id, DM_CONVERSATION_TTL)
+    return conversation
+
+
+def open_conversation(user_low_id, user_high_id):
+    """
+    Get or create the conversation for an ordered user id pair, returning
+    (id, created). On PostgreSQL this is an INSERT ... ON CONFLICT DO NOTHING
+    on conversation_pair_uniq, followed by a lookup only when the pair already
+    exists (so existing conversations are never written); elsewhere
+    get_or_create falls back to a lookup when a concurrent insert wins the
+    constraint.
+    """
+    connection = connections[Conversation.objects.db]
+    if connection.vendor != 'postgresql':
+        conversation, created = Conversation.objects.get_or_create(
+            user_low_id=user_low_id, user_high_id=user_high_id
+        )
+        return conversation.id, created
+    
+    table = connection.ops.quote_name(Conversation._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (user_low_id, user_high_id, created_at, updated_at, last_message_at) '
+            f'VALUES (%s, %s, now(), now(), now()) '
+            f'ON CONFLICT (user_low_id, user_high_id) DO NOTHING '
+            f'RETURNING id',
+            [user_low_id, user_high_id],
+        )
+        row = cursor.fetchone()
+    if row is not None:
+        return row[0], True
+    
+    # The conflicting row is committed by now (ON CONFLICT waits for it), so a
+    # fresh READ COMMITTED statement sees it
+    return Conversation.objects.filter(
+        user_low_id=user_low_id, user_high_id=user_high_id
+    ).values_list('id', flat=True).get(), False
+
+
+# Conversations per inbox page, most recent first
+INBOX_PAGE_SIZE = 50
+
+
 @login_required
 def messages_inbox(request):
-    """List all conversations for current user"""
+    """List the current user's conversations, a page at a time"""
     # Get conversations with latest message info
-    conversations = Conversation.objects.filter(
-        participants=request.user
-    ).annotate(
-        last_message_time=Max('messages__created_at'),
-        unread_count=Count('messages', filter=Q(messages__is_read=False) & ~Q(messages__sender=request.user))
-    ).order_by('-last_message_time')
+    conversations = Conversation.objects.for_user(request.user).with_unread(request.user).order_by('-last_message_at', '-id')
+    
+    # Prefetch the other participants and resolve each conversation's newest message id;
+    # an empty page stops after the first query (no prefetch, no message lookup)
+    page = parse_page(request.GET.get('page'))
+    conversations, has_next = cheap_page(
+        conversations.with_other_participants(request.user).with_last_message_id(),
+        page, size=INBOX_PAGE_SIZE,
+    )
     
-    # Prefetch for efficiency
-    conversations = conversations.prefetch_related('participants', 'participants__profile')
+    # Hydrate all last messages in one query
+    last_messages = DirectMessage.objects.only(
+        'id', 'conversation', 'sender', 'content', 'message_type', 'created_at'
+    ).in_bulk([conv.last_message_id for conv in conversations if conv.last_message_id])
     
     # Attach other participant and last message to each conversation
     for conv in conversations:
-        conv.other_user = conv.get_other_participant(request.user)
-        # Get the actual last message (most recent)
-        conv.last_message = conv.messages.order_by('-created_at').first()
+        conv.other_user = conv.others[0] if conv.others else None
+        conv.last_message = last_messages.get(conv.last_message_id)
     
     context = {
         'conversations': conversations,
+        'page': page,
+        'has_next': has_next,
     }
     return render(request, 'feed/messages/inbox.html', context)
 
 
+# Messages per conversation page, newest first
+CONVERSATION_PAGE_SIZE = 50
+
+
+def thread_page(conversation, before_id=None):
+    """
+    Keyset page of a conversation's messages older than before_id (or the
+    newest page), returned oldest-first for rendering with a has_older flag
+    """
+    # Project only the columns the thread template renders
+    thread = conversation.messages.select_related('post').only(
+        'id', 'conversation', 'sender', 'content', 'message_type', 'created_at',
+        'image', 'video', 'voice_note', 'voice_duration',
+        'post__id', 'post__content',
+    )
+    if before_id is not None:
+        thread = thread.filter(id__lt=before_id)
+    
+    page = list(thread.order_by('-id')[:CONVERSATION_PAGE_SIZE + 1])
+    has_older = len(page) > CONVERSATION_PAGE_SIZE
+    page = page[:CONVERSATION_PAGE_SIZE]
+    page.reverse()
+    return page, has_older
+
+
 @login_required
 def conversation_view(request, username):
     """View/send messages in a conversation"""
@@ -978,55 +1081,155 @@ def conversation_view(request, username):
         return redirect('messages_inbox')
     
     # Get or create conversation
-    conversation = Conversation.objects.filter(
-        participants=request.user
-    ).filter(
-        participants=other_user
-    ).first()
-    
-    if not conversation:
-        conversation = Conversation.objects.create()
-        conversation.participants.add(request.user, other_user)
+    conversation = find_conversation(request.user.id, other_user.id, create=True)
     
     # Mark messages as read
-    conversation.messages.filter(
+    marked = conversation.messages.filter(
         recipient=request.user,
         is_read=False
     ).update(is_read=True)
+    adjust_unread_count(request.user.id, -marked)
     
-    # Get messages
-    messages_list = conversation.messages.select_related(
-        'sender', 'sender__profile', 'post', 'post__author'
-    ).order_by('created_at')
+    # Newest page of the thread; older messages load on scroll via load_older_messages
+    messages_list, has_older = thread_page(conversation)
     
     context = {
         'conversation': conversation,
         'other_user': other_user,
         'messages': messages_list,
+        'latest_message': messages_list[-1] if messages_list else None,
+        'has_older': has_older,
+        'realtime_enabled': bool(settings.CHANNEL_LAYERS),
     }
     return render(request, 'feed/messages/conversation.html', context)
 
 
+def user_picture_url(user):
+    """Picture URL of a user loaded with select_related('profile'); None when they have no profile row"""
+    profile = getattr(user, 'profile', None)
+    return profile.picture_url if profile else None
+
+
+def serialize_message(message, is_own, sender=None):
+    """
+    JSON shape shared by send_message, get_new_messages and the WebSocket push.
+    Times go out as ISO timestamps only; the page formats them. Pass sender
+    when it is already loaded so its picture URL is resolved once.
+    """
+    sender = sender or message.sender
+    message_dict = {
+        'id': message.id,
+        'content': message.content,
+        'message_type': message.message_type,
+        'timestamp': message.created_at.isoformat(),
+        'is_own': is_own,
+        'sender': {
+            'username': sender.username,
+            'profile_picture': user_picture_url(sender)
+        }
+    }
+    
+    if message.image:
+        message_dict['image_url'] = message.image.url
+    if message.video:
+        message_dict['video_url'] = message.video.url
+    if message.voice_note:
+        message_dict['voice_url'] = message.voice_note.url
+        message_dict['voice_duration'] = message.voice_duration
+    if message.post:
+        message_dict['post'] = {
+            'id': message.post.id,
+            'content': message.post.content[:100],
+            'author': message.post.get_author_display(),
+        }
+    
+    return message_dict
+
+
+def deliver_message(message):
+    """
+    Serialize a newly saved message for its sender and push it to the sockets
+    open on its conversation when realtime is enabled. Returns the payload.
+    """
+    payload = serialize_message(message, is_own=True)
+    if settings.CHANNEL_LAYERS:
+        from .realtime import publish_message
+        publish_message(message.conversation_id, message.sender_id, payload)
+    return payload
+
+
+# Columns serialize_message_row needs, fetched with values() for polled JSON
+MESSAGE_ROW_FIELDS = (
+    'id', 'content', 'message_type', 'created_at', 'image', 'video', 'voice_note', 'voice_duration',
+    'post_id', 'post__content', 'post__is_anonymous', 'post__author__username',
+)
+
+
+def serialize_message_row(row, sender):
+    """serialize_message() for a values() row, skipping model and FieldFile instantiation"""
+    message_dict = {
+        'id': row['id'],
+        'content': row['content'],
+        'message_type': row['message_type'],
+        'timestamp': row['created_at'].isoformat(),
+        'is_own': False,
+        'sender': {
+            'username': sender.username,
+            'profile_picture': user_picture_url(sender)
+        }
+    }
+    
+    if row['image']:
+        message_dict['image_url'] = DirectMessage.image.field.storage.url(row['image'])
+    if row['video']:
+        message_dict['video_url'] = DirectMessage.video.field.storage.url(row['video'])
+    if row['voice_note']:
+        message_dict['voice_url'] = DirectMessage.voice_note.field.storage.url(row['voice_note'])
+        message_dict['voice_duration'] = row['voice_duration']
+    if row['post_id']:
+        if row['post__is_anonymous']:
+            author = "Anonymous"
+        else:
+            author = row['post__author__username'] or "Unknown"
+        message_dict['post'] = {
+            'id': row['post_id'],
+            'content': row['post__content'][:100],
+            'author': author,
+        }
+    
+    return message_dict
+
+
+@login_required
+def load_older_messages(request, username):
+    """Return the page of messages before ?before=<message id> for scroll-back"""
+    conversation = find_conversation(request.user.id, user_id_or_404(username))
+    
+    try:
+        before_id = int(request.GET.get('before', ''))
+    except ValueError:
+        return JsonResponse({'html': '', 'has_older': False}, status=400)
+    
+    if not conversation:
+        return JsonResponse({'html': '', 'has_older': False})
+    
+    messages_list, has_older = thread_page(conversation, before_id)
+    html = render_to_string('feed/partials/message_list.html', {
+        'messages': messages_list,
+    }, request=request)
+    
+    return JsonResponse({'html': html, 'has_older': has_older})
+
+
 @login_required
 @require_POST
 def send_message(request, username):
     """Send a message to a user"""
-    recipient = get_object_or_404(User, username=username)
+    recipient_id = user_id_or_404(username)
     
-    if recipient == request.user:
+    if recipient_id == request.user.id:
         return JsonResponse({'success': False, 'error': 'Cannot message yourself'}, status=400)
     
-    # Get or create conversation
-    conversation = Conversation.objects.filter(
-        participants=request.user
-    ).filter(
-        participants=recipient
-    ).first()
-    
-    if not conversation:
-        conversation = Conversation.objects.create()
-        conversation.participants.add(request.user, recipient)
-    
     content = request.POST.get('content', '').strip()
     image = request.FILES.get('image')
     video = request.FILES.get('video')
@@ -1038,71 +1241,117 @@ def send_message(request, username):
     if not any([content, image, video, voice_note, post_id]):
         return JsonResponse({'success': False, 'error': 'Message cannot be empty'}, status=400)
     
+    # Get or create conversation (only once the message is known to be valid)
+    conversation = find_conversation(request.user.id, recipient_id, create=True)
+    
     # Create message
     message = DirectMessage(
         conversation=conversation,
         sender=request.user,
-        recipient=recipient,
+        recipient_id=recipient_id,
         content=content,
     )
     
-    if image:
-        message.image = image
-    if video:
-        message.video = video
-    if voice_note:
-        message.voice_note = voice_note
-        if voice_duration:
-            try:
-                message.voice_duration = int(float(voice_duration))
-            except ValueError:
-                message.voice_duration = 0
-    if post_id:
+    if voice_note and voice_duration:
         try:
-            message.post = Post.objects.get(id=post_id)
-        except Post.DoesNotExist:
-            pass
-    
-    message.save()
+            message.voice_duration = int(float(voice_duration))
+        except ValueError:
+            message.voice_duration = 0
+    if post_id:
+        # Just the columns the message JSON shows; a missing post is ignored
+        message.post = Post.objects.select_related('author').only(
+            'id', 'content', 'is_anonymous', 'author__username'
+        ).filter(id=post_id).first()
+    
+    media = {
+        field_name: upload
+        for field_name, upload in (('image', image), ('video', video), ('voice_note', voice_note))
+        if upload
+    }
     
-    # Build response data
-    response_data = {
-        'success': True,
-        'message': {
-            'id': message.id,
-            'content': message.content,
-            'message_type': message.message_type,
-            'created_at': message.created_at.strftime('%I:%M %p'),
-            'timestamp': message.created_at.isoformat(),
-            'is_own': True,
-            'sender': {
-                'username': request.user.username,
-                'profile_picture': request.user.profile.profile_picture.url if request.user.profile.profile_picture else None
+    if settings.CELERY_BROKER_URL and settings.SHARED_CACHE and media:
+        # Spool the media and let the worker store it, create the message and push it;
+        # the sender's page shows its local copy until then and checks media_send_status
+        # with the returned token, which the worker updates through the shared cache
+        from .tasks import send_media_message
+        
+        spooled = {field_name: spool_upload(upload) for field_name, upload in media.items()}
+        token = uuid.uuid4().hex
+        record_media_send(token, request.user.id, 'pending')
+        send_media_message.delay(
+            conversation.id, request.user.id, recipient_id, content,
+            message.post_id, message.voice_duration, spooled, token
+        )
+        return JsonResponse({
+            'success': True,
+            'pending': token,
+            'message': {
+                'content': content,
+                'timestamp': timezone.now().isoformat(),
+                'is_own': True,
             }
-        }
-    }
+        })
     
-    if message.image:
-        response_data['message']['image_url'] = message.image.url
-    if message.video:
-        response_data['message']['video_url'] = message.video.url
-    if message.voice_note:
-        response_data['message']['voice_url'] = message.voice_note.url
-        response_data['message']['voice_duration'] = message.voice_duration
-    if message.post:
-        response_data['message']['post'] = {
-            'id': message.post.id,
-            'content': message.post.content[:100],
-            'author': message.post.get_author_display(),
-        }
+    for field_name, upload in media.items():
+        setattr(message, field_name, upload)
+    
+    # The insert and the conversation timestamp bump land together
+    with transaction.atomic():
+        message.save()
+    
+    payload = deliver_message(message)
     
-    return JsonResponse(response_data)
+    return JsonResponse({'success': True, 'message': payload})
+
+
+@login_required
+def media_send_status(request, token):
+    """Where a DM handed to the worker by send_message stands, for its sender"""
+    state = cache.get(media_send_key(token))
+    if state is None or state['sender_id'] != request.user.id:
+        return JsonResponse({'status': 'unknown'}, status=404)
+    return JsonResponse({'status': state['status']})
+
+
+def read_new_messages(new_messages):
+    """
+    Return MESSAGE_ROW_FIELDS rows for new_messages and mark the unread ones
+    read, as (rows, marked). On PostgreSQL both happen in one statement via a
+    data-modifying CTE; the SELECT sees the pre-update snapshot, so messages
+    already read elsewhere are still returned.
+    """
+    connection = connections[new_messages.db]
+    if connection.vendor != 'postgresql':
+        marked = new_messages.filter(is_read=False).update(is_read=True)
+        return list(new_messages.values(*MESSAGE_ROW_FIELDS)), marked
+    
+    # Joined fields get a column alias (post__content -> post_content) so the
+    # outer SELECT names each column instead of relying on their position
+    columns = [field.replace('__', '_') for field in MESSAGE_ROW_FIELDS]
+    aliases = {column: F(field) for field, column in zip(MESSAGE_ROW_FIELDS, columns) if column != field}
+    unread_sql, unread_params = new_messages.filter(is_read=False).order_by().values('id').query.sql_with_params()
+    select_sql, select_params = new_messages.annotate(**aliases).values(*columns).query.sql_with_params()
+    table = connection.ops.quote_name(DirectMessage._meta.db_table)
+    selected = ', '.join(f'new_messages.{connection.ops.quote_name(column)}' for column in columns)
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH marked AS (UPDATE {table} SET is_read = true WHERE id IN ({unread_sql}) RETURNING 1) '
+            f'SELECT {selected}, (SELECT COUNT(*) FROM marked) FROM ({select_sql}) AS new_messages '
+            f'ORDER BY new_messages.created_at',
+            unread_params + select_params,
+        )
+        results = cursor.fetchall()
+    
+    rows = [dict(zip(MESSAGE_ROW_FIELDS, result)) for result in results]
+    marked = results[0][-1] if results else 0
+    return rows, marked
 
 
 @login_required
 def get_new_messages(request, username):
     """Poll for new messages in a conversation (for real-time updates)"""
-    other_user = get_object_or_404(User, username=username)
+    other_user_id = user_id_or_404(username)
     since = request.GET.get('since')
     
     if not since:
@@ -1110,57 +1359,52 @@ def get_new_messages(request, username):
     
     try:
         since_dt = parse_datetime(since)
+        # Compared with the aware last_message_at below, so read an offset-less
+        # timestamp in the current time zone
+        if timezone.is_naive(since_dt):
+            since_dt = timezone.make_aware(since_dt)
         
         # Get conversation
-        conversation = Conversation.objects.filter(
-            participants=request.user
-        ).filter(
-            participants=other_user
-        ).first()
+        conversation = find_conversation(request.user.id, other_user_id)
         
         if not conversation:
             return JsonResponse({'messages': []})
         
+        # Nothing has been sent in this conversation since the client's timestamp
+        # (see settings.SHARED_CACHE). On a miss, seed from last_message_at (an upper
+        # bound on the newest message); add() never overwrites a fresher value stored
+        # by the DirectMessage receiver.
+        if settings.SHARED_CACHE:
+            key = last_message_key(conversation.id)
+            last_message_at = cache.get(key)
+            if last_message_at is None:
+                last_message_at = Conversation.objects.filter(id=conversation.id).values_list(
+                    'last_message_at', flat=True
+                ).first()
+                if last_message_at is not None:
+                    cache.add(key, last_message_at, LAST_MESSAGE_TTL)
+            if last_message_at is not None and last_message_at <= since_dt:
+                return JsonResponse({'messages': []})
+        
         # Get new messages
         new_messages = conversation.messages.filter(
             created_at__gt=since_dt
         ).exclude(
             sender=request.user
-        ).select_related('sender', 'sender__profile', 'post', 'post__author').order_by('created_at')
+        ).order_by('created_at')
         
-        # Mark as read
-        new_messages.filter(is_read=False).update(is_read=True)
+        # Fetch and mark as read
+        rows, marked = read_new_messages(new_messages)
+        adjust_unread_count(request.user.id, -marked)
         
+        # Every new message here is from the other user, so their row and picture URL
+        # are loaded once, and only when there is something to send
         messages_data = []
-        for msg in new_messages:
-            message_dict = {
-                'id': msg.id,
-                'content': msg.content,
-                'message_type': msg.message_type,
-                'created_at': msg.created_at.strftime('%I:%M %p'),
-                'timestamp': msg.created_at.isoformat(),
-                'is_own': False,
-                'sender': {
-                    'username': msg.sender.username,
-                    'profile_picture': msg.sender.profile.profile_picture.url if msg.sender.profile.profile_picture else None
-                }
-            }
-            
-            if msg.image:
-                message_dict['image_url'] = msg.image.url
-            if msg.video:
-                message_dict['video_url'] = msg.video.url
-            if msg.voice_note:
-                message_dict['voice_url'] = msg.voice_note.url
-                message_dict['voice_duration'] = msg.voice_duration
-            if msg.post:
-                message_dict['post'] = {
-                    'id': msg.post.id,
-                    'content': msg.post.content[:100],
-                    'author': msg.post.get_author_display(),
-                }
-            
-            messages_data.append(message_dict)
+        if rows:
+            other_user = User.objects.select_related('profile').only(
+                'username', 'profile__profile_picture'
+            ).get(id=other_user_id)
+            messages_data = [serialize_message_row(row, other_user) for row in rows]
         
         return JsonResponse({'messages': messages_data})
         
@@ -1171,70 +1415,70 @@ def get_new_messages(request, username):
 @login_required
 def start_conversation(request, username):
     """Start or go to conversation with a user"""
-    other_user = get_object_or_404(User, username=username)
-    return redirect('conversation', username=other_user.username)
+    user_id_or_404(username)
+    return redirect('conversation', username=username)
 
 
 @login_required
 def share_post_dm(request, post_id):
     """Share a post via DM"""
-    post = get_object_or_404(Post, id=post_id)
+    # Just the columns the shared message's JSON shows
+    post = get_object_or_404(
+        Post.objects.select_related('author').only('id', 'content', 'is_anonymous', 'author__username'),
+        id=post_id
+    )
     
     if request.method == 'GET':
-        # Return list of recent conversations/users
-        recent_conversations = Conversation.objects.filter(
-            participants=request.user
-        ).prefetch_related('participants', 'participants__profile').order_by('-updated_at')[:20]
+        # Return the users from recent conversations, fetched directly with their profiles
+        recent_users = User.objects.filter(
+            conversations__participants=request.user
+        ).exclude(
+            id=request.user.id
+        ).annotate(
+            conversation_at=Max('conversations__last_message_at')
+        ).select_related('profile').only(
+            'username', 'first_name', 'last_name', 'profile__profile_picture'
+        ).order_by('-conversation_at')[:20]
         
-        users = []
-        for conv in recent_conversations:
-            other = conv.get_other_participant(request.user)
-            if other:
-                users.append({
-                    'username': other.username,
-                    'name': other.get_full_name() or other.username,
-                    'profile_picture': other.profile.profile_picture.url if other.profile.profile_picture else None,
-                })
+        users = [
+            {
+                'username': other.username,
+                'name': other.get_full_name() or other.username,
+                'profile_picture': user_picture_url(other),
+            }
+            for other in recent_users
+        ]
         
         return JsonResponse({'success': True, 'users': users})
     
     elif request.method == 'POST':
         username = request.POST.get('username')
-        recipient = get_object_or_404(User, username=username)
+        recipient_id = user_id_or_404(username)
         
-        if recipient == request.user:
+        if recipient_id == request.user.id:
             return JsonResponse({'success': False, 'error': 'Cannot share with yourself'}, status=400)
         
         # Get or create conversation
-        conversation = Conversation.objects.filter(
-            participants=request.user
-        ).filter(
-            participants=recipient
-        ).first()
-        
-        if not conversation:
-            conversation = Conversation.objects.create()
-            conversation.participants.add(request.user, recipient)
-        
-        # Create message with post
-        message = DirectMessage.objects.create(
-            conversation=conversation,
-            sender=request.user,
-            recipient=recipient,
-            post=post,
-            content=request.POST.get('message', '')
-        )
+        conversation = find_conversation(request.user.id, recipient_id, create=True)
         
-        # Track share
-        PostShare.objects.create(
-            user=request.user,
-            post=post,
-            shared_via='DM'
-        )
+        # Create the message, track the share and bump the share count atomically
+        with transaction.atomic():
+            message = DirectMessage.objects.create(
+                conversation=conversation,
+                sender=request.user,
+                recipient_id=recipient_id,
+                post=post,
+                content=request.POST.get('message', '')
+            )
+            PostShare.objects.create(
+                user=request.user,
+                post=post,
+                shared_via='DM'
+            )
+            Post.objects.filter(pk=post.pk).update(shares_count=F('shares_count') + 1)
         
-        # Update post share count
-        post.shares_count = post.share_records.count()
-        post.save(update_fields=['shares_count'])
+        # Show up in the recipient's open thread like any other message
+        deliver_message(message)
         
         return JsonResponse({'success': True, 'message': 'Post shared successfully!'})
 
@@ -1244,10 +1488,18 @@ def share_post_dm(request, post_id):
 @login_required
 def get_unread_count(request):
     """Get total unread message count for navbar badge"""
-    count = DirectMessage.objects.filter(
-        recipient=request.user,
-        is_read=False
-    ).count()
+    # Served from the cached counter (see settings.SHARED_CACHE); recount (off the
+    # partial dm_unread_idx) when it's missing. add() leaves alone a counter
+    # another request seeded in the meantime
+    key = unread_count_key(request.user.id)
+    count = cache.get(key) if settings.SHARED_CACHE else None
+    if count is None:
+        count = DirectMessage.objects.filter(
+            recipient=request.user,
+            is_read=False
+        ).count()
+        if settings.SHARED_CACHE:
+            cache.add(key, count, UNREAD_COUNT_TTL)
     return JsonResponse({'unread_count': count})
 
 
@@ -1257,19 +1509,14 @@ def get_unread_count(request):
 @login_required
 def mark_conversation_read(request, username):
     """Mark all messages in a conversation as read"""
-    other_user = get_object_or_404(User, username=username)
-    
-    conversation = Conversation.objects.filter(
-        participants=request.user
-    ).filter(
-        participants=other_user
-    ).first()
+    conversation = find_conversation(request.user.id, user_id_or_404(username))
     
     if conversation:
-        conversation.messages.filter(
+        marked = conversation.messages.filter(
             recipient=request.user,
             is_read=False
         ).update(is_read=True)
+        adjust_unread_count(request.user.id, -marked)
     
     return JsonResponse({'success': True})
 
@@ -1279,7 +1526,7 @@ def delete_message(request, message_id):
     """Delete a message (only sender can delete)"""
     message = get_object_or_404(DirectMessage, id=message_id)
     
-    if message.sender != request.user:
+    if message.sender_id != request.user.id:
         return JsonResponse({'success': False, 'error': 'You can only delete your own messages'}, status=403)
     
     message.delete()
@@ -1294,18 +1541,21 @@ def search_users_dm(request):
     if len(query) < 2:
         return JsonResponse({'users': []})
     
+    # Substring matches are served by the trigram indexes on PostgreSQL (migration 0016)
     users = User.objects.filter(
         Q(username__icontains=query) |
         Q(first_name__icontains=query) |
         Q(last_name__icontains=query)
-    ).exclude(id=request.user.id).select_related('profile')[:15]
+    ).exclude(id=request.user.id).select_related('profile').only(
+        'username', 'first_name', 'last_name', 'profile__profile_picture'
+    )[:15]
     
     results = []
     for user in users:
         results.append({
             'username': user.username,
             'name': user.get_full_name() or user.username,
-            'profile_picture': user.profile.profile_picture.url if user.profile.profile_picture else None,
+            'profile_picture': user_picture_url(user),
         })
     
     return JsonResponse({'users': results})
@@ -1313,18 +1563,16 @@ def search_users_dm(request):
 @login_required
 def get_share_link_view(request, post_id):
     """Generate shareable link for post"""
-    post = get_object_or_404(Post, id=post_id)
-    
-    # Track share
-    PostShare.objects.create(
-        user=request.user,
-        post=post,
-        shared_via='LINK'
-    )
-    
-    # Update share count
-    post.shares_count = post.share_records.count()
-    post.save(update_fields=['shares_count'])
+    # Bump the share count atomically and track the share; the UPDATE's row
+    # count doubles as the existence check, so there's no separate lookup
+    with transaction.atomic():
+        if not Post.objects.filter(pk=post_id).update(shares_count=F('shares_count') + 1):
+            raise Http404('No Post matches the given query.')
+        PostShare.objects.create(
+            user=request.user,
+            post_id=post_id,
+            shared_via='LINK'
+        )
     
     share_url = request.build_absolute_uri(f'/post/{post_id}/')
     